@@ -103,6 +103,7 @@ def retrieve(query: str, embed_model, collection, top_k: int) -> List[Dict]:
             "text":     doc,
             "file":     meta.get("file_name", "unknown"),
             "chunk":    meta.get("chunk_index", "?"),
+            "section":  meta.get("section", ""),
             "score":    round(1 - dist, 3),  # cosine similarity
         })
     return chunks
@@ -115,7 +116,8 @@ def ask_ollama(question: str, context_chunks: List[Dict]) -> str:
 
     # Build context block
     context_text = "\n\n---\n\n".join(
-        f"[{c['file']}, chunk {c['chunk']}] (relevance {c['score']}):\n{c['text']}"
+        f"[{c['file']}{' § ' + c['section'] if c['section'] else ''}, chunk {c['chunk']}] "
+        f"(relevance {c['score']}):\n{c['text']}"
         for c in context_chunks
     )
 
@@ -0,0 +1,194 @@
+"""
+embed_cache.py  —  Persistent embedding cache keyed by (model, chunk hash)
+==========================================================================
+Identical chunk text is embedded once per model, ever. `--reset`, chunk-size
+experiments and metadata-only re-indexes then only pay for chunks whose text
+actually changed.
+
+Layout (one directory per model):
+  <EMBED_CACHE_PATH>/<model>/meta.json     — model, dim, dtype
+  <EMBED_CACHE_PATH>/<model>/vectors.bin   — rows of float16/float32, read via np.memmap
+  <EMBED_CACHE_PATH>/<model>/index.bin     — 16-byte blake2b key per row, same order
+
+Both files are append-only, so a crash can at worst leave a torn last row,
+which is ignored on the next open.
+
+Usage (library):
+    cache = EmbeddingCache.open(EMBED_MODEL, dim=model.get_sentence_embedding_dimension())
+    vectors = encode_cached(lambda t: model.encode(t, normalize_embeddings=True), cache, texts)
+
+Usage (CLI):
+    python scripts/embed_cache.py            # show cache size per model
+    python scripts/embed_cache.py --clear    # delete the cache(s) for EMBED_MODEL
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import argparse
+import unicodedata
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CHROMA_PATH      = Path(os.getenv("CHROMA_DB_PATH", "./rag/vectordb"))
+EMBED_MODEL      = os.getenv("EMBED_MODEL", "BAAI/bge-small-en-v1.5")
+EMBED_CACHE_PATH = Path(os.getenv("EMBED_CACHE_PATH", str(CHROMA_PATH.with_name("embed_cache"))))
+EMBED_CACHE_DTYPE = os.getenv("EMBED_CACHE_DTYPE", "float16")  # float16 | float32
+
+KEY_BYTES = 16
+_WS = re.compile(r"\s+")
+
+
+def chunk_key(text: str) -> bytes:
+    """Hash of the normalized chunk: NFC, whitespace runs collapsed, trimmed."""
+    norm = _WS.sub(" ", unicodedata.normalize("NFC", text)).strip()
+    return hashlib.blake2b(norm.encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    def __init__(self, root: Path, model: str, dim: int, dtype: str):
+        self.root  = root
+        self.model = model
+        self.dim   = dim
+        self.dtype = np.dtype(dtype)
+        self._vec_path = root / "vectors.bin"
+        self._idx_path = root / "index.bin"
+        self._rows: Dict[bytes, int] = {}
+        self._mm: Optional[np.memmap] = None
+        self.hits = self.misses = 0
+        self._load()
+
+    @classmethod
+    def open(cls, model: str = EMBED_MODEL, dim: Optional[int] = None,
+             path: Path = EMBED_CACHE_PATH, dtype: str = EMBED_CACHE_DTYPE) -> "EmbeddingCache":
+        """Open (or create, once `dim` is known) the cache directory for `model`."""
+        root = path / re.sub(r"[^A-Za-z0-9._-]+", "__", model)
+        meta_path = root / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if meta["model"] != model or (dim and meta["dim"] != dim):
+                raise ValueError(f"Embedding cache at {root} is for {meta['model']} (dim {meta['dim']})")
+            return cls(root, model, meta["dim"], meta["dtype"])
+        if dim is None:
+            raise ValueError("dim is required to create a new embedding cache")
+        root.mkdir(parents=True, exist_ok=True)
+        meta_path.write_text(json.dumps({"model": model, "dim": dim, "dtype": dtype}))
+        return cls(root, model, dim, dtype)
+
+    # ── Storage ────────────────────────────────────────────────────────────
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim * self.dtype.itemsize
+
+    def _load(self):
+        keys = self._idx_path.read_bytes() if self._idx_path.exists() else b""
+        vec_size = self._vec_path.stat().st_size if self._vec_path.exists() else 0
+        n = min(len(keys) // KEY_BYTES, vec_size // self._row_bytes)
+        self._rows = {keys[i * KEY_BYTES:(i + 1) * KEY_BYTES]: i for i in range(n)}
+        # Drop a torn tail so the next append lines up again
+        for path, size, want in ((self._idx_path, len(keys), n * KEY_BYTES),
+                                 (self._vec_path, vec_size, n * self._row_bytes)):
+            if size != want:
+                with open(path, "r+b") as f:
+                    f.truncate(want)
+        self._count = n
+        self._mm = None
+
+    def _vectors(self) -> np.ndarray:
+        if self._mm is None or self._mm.shape[0] != self._count:
+            self._mm = np.memmap(self._vec_path, dtype=self.dtype, mode="r", shape=(self._count, self.dim)) \
+                if self._count else np.zeros((0, self.dim), self.dtype)
+        return self._mm
+
+    def __len__(self) -> int:
+        return self._count
+
+    # ── Lookup / insert ────────────────────────────────────────────────────
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        vecs = self._vectors()
+        out = []
+        for k in keys:
+            row = self._rows.get(k)
+            out.append(None if row is None else np.asarray(vecs[row], dtype=np.float32))
+        return out
+
+    def put_many(self, keys: Sequence[bytes], vectors: np.ndarray):
+        new = {k: v for k, v in zip(keys, vectors) if k not in self._rows}  # also drops repeats
+        if not new:
+            return
+        # Vectors first: a key without its row is treated as torn and dropped
+        with open(self._vec_path, "ab") as f:
+            f.write(np.asarray(list(new.values()), dtype=self.dtype).tobytes())
+        with open(self._idx_path, "ab") as f:
+            f.write(b"".join(new))
+        for k in new:
+            self._rows[k] = self._count
+            self._count += 1
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        self._rows, self._count, self._mm = {}, 0, None
+
+
+def encode_cached(encode: Callable[[List[str]], np.ndarray], cache: Optional[EmbeddingCache],
+                  texts: List[str]) -> np.ndarray:
+    """Embed `texts`, taking known chunks from `cache` and encoding only the rest.
+
+    `encode` maps a list of texts to a float32 (n, dim) array of normalized vectors.
+    """
+    if cache is None:
+        return encode(texts)
+    keys = [chunk_key(t) for t in texts]
+    found = cache.get_many(keys)
+    # Repeated texts within the batch are encoded once and fanned back out
+    missing: Dict[bytes, List[int]] = {}
+    for i, v in enumerate(found):
+        if v is None:
+            missing.setdefault(keys[i], []).append(i)
+    # In-batch repeats of a missing text are neither hits nor extra misses
+    cache.hits   += sum(v is not None for v in found)
+    cache.misses += len(missing)
+    if missing:
+        fresh = encode([texts[idx[0]] for idx in missing.values()])
+        cache.put_many(list(missing), fresh)
+        for idx, v in zip(missing.values(), fresh):
+            for i in idx:
+                found[i] = np.asarray(v, dtype=np.float32)
+    return np.stack(found) if found else np.zeros((0, cache.dim), np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the embedding cache")
+    parser.add_argument("--clear", action="store_true", help=f"Delete the cache for {EMBED_MODEL}")
+    args = parser.parse_args()
+
+    if args.clear:
+        # Includes per-backend variants such as "<model>@onnx-int8"
+        metas = [json.loads(p.read_text()) for p in EMBED_CACHE_PATH.glob("*/meta.json")]
+        names = [m["model"] for m in metas if m["model"] == EMBED_MODEL or m["model"].startswith(EMBED_MODEL + "@")]
+        for name in names:
+            EmbeddingCache.open(name).clear()
+            print(f"Cleared embedding cache for {name}")
+        if not names:
+            print(f"No embedding cache for {EMBED_MODEL}")
+        return
+
+    if not EMBED_CACHE_PATH.exists():
+        print(f"No embedding cache at {EMBED_CACHE_PATH}")
+        return
+    for meta_path in sorted(EMBED_CACHE_PATH.glob("*/meta.json")):
+        meta = json.loads(meta_path.read_text())
+        cache = EmbeddingCache.open(meta["model"])
+        size_mb = sum(f.stat().st_size for f in meta_path.parent.iterdir()) / 1e6
+        print(f"{meta['model']:<40} {len(cache):>9,} vectors  dim {meta['dim']}  {meta['dtype']}  {size_mb:,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+embedder.py  —  Throughput-oriented embedding engine for ingest.py
+==================================================================
+Wraps the sentence-transformers model with:
+  • length-sorted batching — chunks of similar token length share a batch,
+    so little compute is spent on padding
+  • adaptive batch size — doubles while throughput keeps improving, capped
+    by a token budget derived from EMBED_MEMORY_MB
+  • backends — torch (default), onnx (ONNX Runtime, fp32) and onnx-int8
+    (dynamically quantized ONNX, exported once to EMBED_ONNX_PATH)
+  • explicit thread counts for torch / ONNX Runtime (EMBED_THREADS)
+
+Vectors are L2-normalized float32 and returned in input order.
+
+Usage (library):
+    embedder = Embedder.load()
+    vectors = embedder.encode(texts)
+
+Usage (benchmark):
+    python scripts/embedder.py --bench
+    python scripts/embedder.py --bench --backends torch,onnx-int8 --limit 1000
+"""
+
+import os
+import gc
+import sys
+import time
+import platform
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+CHROMA_PATH     = Path(os.getenv("CHROMA_DB_PATH", "./rag/vectordb"))
+EMBED_MODEL     = os.getenv("EMBED_MODEL", "BAAI/bge-small-en-v1.5")
+EMBED_BACKEND   = os.getenv("EMBED_BACKEND", "torch")          # torch | onnx | onnx-int8
+EMBED_THREADS   = int(os.getenv("EMBED_THREADS", os.cpu_count() or 4))
+EMBED_MEMORY_MB = int(os.getenv("EMBED_MEMORY_MB", 1024))      # activation budget per batch
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", 256))
+EMBED_ONNX_PATH = Path(os.getenv("EMBED_ONNX_PATH", str(CHROMA_PATH.with_name("onnx"))))
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+START_BATCH = 8
+
+
+class Embedder:
+    def __init__(self, model, name: str, backend: str, threads: int,
+                 memory_mb: int = EMBED_MEMORY_MB, max_batch: int = EMBED_MAX_BATCH):
+        self.model     = model
+        self.name      = name
+        self.backend   = backend
+        self.threads   = threads
+        self.dim       = model.get_sentence_embedding_dimension()
+        self.tokenizer = model.tokenizer
+        self.max_seq_length = model.max_seq_length
+        # fp32 ONNX matches torch to ~1e-6, so both share cache entries
+        self.cache_name = name if backend != "onnx-int8" else f"{name}@{backend}"
+        self.max_batch  = max_batch
+        self.batch_size = min(START_BATCH, max_batch)
+        self._memory_bytes = memory_mb * 1024 * 1024
+        self._best_rate = 0.0
+        self._growing   = True
+        try:
+            config = model[0].auto_model.config
+        except (AttributeError, IndexError, TypeError):
+            config = None
+        self._hidden = getattr(config, "hidden_size", 384)
+        self._heads  = getattr(config, "num_attention_heads", 12)
+
+    @classmethod
+    def load(cls, model: str = EMBED_MODEL, backend: str = EMBED_BACKEND,
+             threads: int = EMBED_THREADS, **kw) -> "Embedder":
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown EMBED_BACKEND {backend!r} (choose from {', '.join(BACKENDS)})")
+        from sentence_transformers import SentenceTransformer
+        if backend == "torch":
+            import torch
+            torch.set_num_threads(threads)
+            # CPU: avoids MPS (Apple Metal) OOM kills on unified memory Macs
+            st = SentenceTransformer(model, device="cpu")
+        else:
+            st = SentenceTransformer(_onnx_source(model, backend), device="cpu",
+                                     backend="onnx", model_kwargs=_onnx_kwargs(backend, threads))
+        return cls(st, model, backend, threads, **kw)
+
+    # ── Batching ───────────────────────────────────────────────────────────
+    def token_lengths(self, texts: List[str]) -> np.ndarray:
+        ids = self.tokenizer(texts, add_special_tokens=True, truncation=True,
+                             max_length=self.max_seq_length)["input_ids"]
+        return np.fromiter((len(x) for x in ids), dtype=np.int64, count=len(texts))
+
+    def _max_rows(self, seq_len: int) -> int:
+        """Rows of `seq_len` tokens whose peak activations fit the memory budget.
+
+        Per token and layer: ~10 hidden-sized fp32 tensors (q/k/v, context,
+        FFN) plus a softmax over `seq_len` scores per head.
+        """
+        per_token = 4 * (10 * self._hidden + 2 * self._heads * seq_len)
+        return max(1, self._memory_bytes // (per_token * seq_len))
+
+    def _tune(self, rows: int, tokens: int, secs: float):
+        """Double the batch while tokens/s improves; stop growing once it doesn't."""
+        if not self._growing or rows < self.batch_size or secs <= 0:
+            return
+        rate = tokens / secs
+        if rate < self._best_rate * 1.05:
+            self._growing = False
+            return
+        self._best_rate = rate
+        self.batch_size = min(self.batch_size * 2, self.max_batch)
+        self._growing = self.batch_size < self.max_batch
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.model.encode(
+            texts,
+            batch_size=len(texts),
+            show_progress_bar=False,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        ), dtype=np.float32)
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """(n, dim) float32 normalized vectors, in the order of `texts`."""
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        if not texts:
+            return out
+        lengths = self.token_lengths(texts)
+        # Longest first: the most memory-hungry batch runs before any growth
+        order = np.argsort(-lengths, kind="stable")
+        i = 0
+        while i < len(order):
+            seq_len = int(lengths[order[i]])
+            rows = min(self.batch_size, self._max_rows(seq_len), len(order) - i)
+            idx = order[i : i + rows]
+            t = time.perf_counter()
+            out[idx] = self._encode_batch([texts[j] for j in idx])
+            self._tune(rows, rows * seq_len, time.perf_counter() - t)
+            i += rows
+        return out
+
+
+# ── ONNX export ────────────────────────────────────────────────────────────
+def _quant_config() -> str:
+    return "arm64" if platform.machine().lower() in ("arm64", "aarch64") else "avx2"
+
+
+def _onnx_source(model: str, backend: str) -> str:
+    """Model id for fp32 ONNX; a local copy with the int8 graph for onnx-int8."""
+    if backend == "onnx":
+        return model
+    local = EMBED_ONNX_PATH / model.replace("/", "__")
+    if not (local / "onnx" / f"model_qint8_{_quant_config()}.onnx").exists():
+        from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+        fp32 = SentenceTransformer(model, device="cpu", backend="onnx")
+        fp32.save(str(local))
+        export_dynamic_quantized_onnx_model(fp32, _quant_config(), str(local))
+    return str(local)
+
+
+def _onnx_kwargs(backend: str, threads: int) -> dict:
+    import onnxruntime as ort
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = threads
+    opts.inter_op_num_threads = 1
+    kwargs = {"provider": "CPUExecutionProvider", "session_options": opts}
+    if backend == "onnx-int8":
+        kwargs["file_name"] = f"onnx/model_qint8_{_quant_config()}.onnx"
+    return kwargs
+
+
+# ── Benchmark ──────────────────────────────────────────────────────────────
+def load_sample(docs_path: Path, limit: int) -> List[str]:
+    """Chunks from the docs folder, exactly as ingest.py would produce them."""
+    from ingest import extract_text, chunk_text
+    chunks: List[str] = []
+    for fpath in sorted(p for ext in ("*.md", "*.txt", "*.pdf") for p in docs_path.rglob(ext)):
+        chunks.extend(c["text"] for c in chunk_text(extract_text(fpath)))
+        if len(chunks) >= limit:
+            break
+    return chunks[:limit]
+
+
+def legacy_encode(embedder: Embedder, texts: List[str]) -> np.ndarray:
+    """The previous ingest loop: 8 chunks per call, inner batch 4, gc after each."""
+    out = []
+    for i in range(0, len(texts), 8):
+        out.append(embedder.model.encode(texts[i : i + 8], batch_size=4, show_progress_bar=False,
+                                         normalize_embeddings=True, convert_to_numpy=True))
+        gc.collect()
+    return np.concatenate(out)
+
+
+def bench(docs_path: Path, backends: List[str], limit: int, threads: int):
+    from rich.console import Console
+    from rich.table import Table
+    console = Console()
+
+    texts = load_sample(docs_path, limit)
+    if not texts:
+        console.print(f"[red]No chunks found under {docs_path}[/]")
+        sys.exit(1)
+    console.log(f"{len(texts)} chunks from [dim]{docs_path}[/], {threads} thread(s)")
+
+    table = Table(title=f"Embedding Throughput — {EMBED_MODEL}", border_style="cyan")
+    table.add_column("Backend", style="bold")
+    table.add_column("Load (s)", justify="right")
+    table.add_column("Chunks/s", justify="right", style="cyan")
+    table.add_column("Tokens/s", justify="right")
+    table.add_column("Batch", justify="right")
+    table.add_column("Min cos vs torch", justify="right")
+
+    reference: Optional[np.ndarray] = None
+    for backend in ["legacy"] + backends:
+        t = time.perf_counter()
+        embedder = Embedder.load(backend="torch" if backend == "legacy" else backend, threads=threads)
+        load_s = time.perf_counter() - t
+        tokens = int(embedder.token_lengths(texts).sum())
+        encode = (lambda x: legacy_encode(embedder, x)) if backend == "legacy" else embedder.encode
+        encode(texts[:16])                        # warm-up
+        t = time.perf_counter()
+        vectors = encode(texts)
+        secs = time.perf_counter() - t
+        if reference is None:
+            reference = vectors
+        agreement = float(np.min(np.sum(vectors * reference, axis=1)))
+        table.add_row(backend, f"{load_s:.1f}", f"{len(texts) / secs:,.1f}", f"{tokens / secs:,.0f}",
+                      "4" if backend == "legacy" else str(embedder.batch_size), f"{agreement:.4f}")
+        console.log(f"  {backend}: {secs:.1f}s")
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark embedding backends on your documents")
+    parser.add_argument("--bench",     action="store_true", help="Run the throughput benchmark")
+    parser.add_argument("--docs-path", type=Path, default=Path(os.getenv("DOCS_PATH", "./docs")))
+    parser.add_argument("--backends",  default=",".join(BACKENDS),
+                        help="Comma-separated backends to compare against the legacy loop")
+    parser.add_argument("--limit",     type=int, default=2000, help="Chunks to embed per backend")
+    parser.add_argument("--threads",   type=int, default=EMBED_THREADS)
+    args = parser.parse_args()
+    if not args.bench:
+        parser.print_help()
+        return
+    bench(args.docs_path, [b for b in args.backends.split(",") if b], args.limit, args.threads)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,21 +15,65 @@ Usage:
     python scripts/ingest.py
     python scripts/ingest.py --docs-path /path/to/papers
     python scripts/ingest.py --reset          # clears DB and rebuilds
-    python scripts/ingest.py --batch-size 25  # fewer chunks per batch (less RAM)
+    python scripts/ingest.py --batch-size 64  # chunks per ChromaDB write
+    python scripts/ingest.py --workers 6      # extraction processes (default: cores - 1)
+    python scripts/ingest.py --no-cache       # embed everything, bypass the embedding cache
+
+Incremental mode:
+  A manifest next to the vector DB (<CHROMA_DB_PATH>.manifest.json) records
+  each file's path, size, mtime, content hash and chunk ids. Files whose size
+  and mtime are unchanged are skipped without being read; changed files are
+  re-embedded after their old chunks are deleted; files that disappeared from
+  the docs folder have their chunks purged.
+
+Embedding cache:
+  Vectors are also stored per (model, chunk text hash) in EMBED_CACHE_PATH
+  (see embed_cache.py), so --reset, renamed files and re-chunked documents
+  only embed chunks whose text is new.
+
+Pipeline:
+  A process pool extracts and chunks files in parallel and feeds a bounded
+  queue; the main process is the single consumer that embeds and writes to
+  ChromaDB. When the embedder falls behind, the queue fills and no new files
+  are extracted until it drains (backpressure). Per-stage throughput is
+  printed at the end. A file that fails to extract is logged and skipped;
+  it is not recorded in the manifest, so the next run retries it.
+
+Chunking:
+  Chunks are measured in tokens of the embedding model's tokenizer and never
+  exceed its window. Boundaries follow the document: markdown headings start
+  a new chunk, paragraphs and $$ math blocks are kept whole where they fit,
+  and only oversized paragraphs are split (by sentence, then by token). Each
+  chunk records its section path and character offsets in the metadata.
+
+Embedding:
+  Each file's chunks are embedded in one call to the engine in embedder.py
+  (length-sorted, adaptively sized batches; EMBED_BACKEND=torch|onnx|onnx-int8).
+  Compare backends with `python scripts/embedder.py --bench`.
 """
 
 import os
+import re
 import sys
-import gc
+import json
+import time
+import hashlib
+import queue
 import argparse
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from embed_cache import EmbeddingCache, encode_cached
+from embedder import Embedder, EMBED_BACKEND, EMBED_THREADS
+
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
 from rich.progress import (
     Progress, SpinnerColumn, TextColumn,
     BarColumn, MofNCompleteColumn, TimeElapsedColumn,
@@ -41,10 +85,18 @@ console = Console()
 DOCS_PATH     = Path(os.getenv("DOCS_PATH", "./docs"))
 CHROMA_PATH   = Path(os.getenv("CHROMA_DB_PATH", "./rag/vectordb"))
 EMBED_MODEL   = os.getenv("EMBED_MODEL", "BAAI/bge-small-en-v1.5")
-CHUNK_SIZE    = int(os.getenv("CHUNK_SIZE", 512))   # reduced from 1024
-CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 64)) # reduced from 128
+CHUNK_SIZE    = int(os.getenv("CHUNK_SIZE", 384))   # tokens, capped at the model window
+CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 48)) # tokens carried into the next chunk
 COLLECTION    = "science_papers"
-BATCH_SIZE    = 8    # chunks per batch — small to avoid MPS/OOM on Apple Silicon
+MANIFEST_PATH = CHROMA_PATH.with_name(CHROMA_PATH.name + ".manifest.json")
+BATCH_SIZE    = int(os.getenv("INGEST_WRITE_BATCH", 128))  # chunks per ChromaDB upsert
+WORKERS       = int(os.getenv("INGEST_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+QUEUE_SIZE    = int(os.getenv("INGEST_QUEUE_SIZE", 8))  # extracted files waiting for the embedder
+# Settings that change chunk boundaries; a mismatch re-chunks every file once
+CHUNKING      = {"chunker": 2, "model": EMBED_MODEL, "size": CHUNK_SIZE, "overlap": CHUNK_OVERLAP}
+
+# Tokenizers are used in the parent and in forked workers; keep them single-threaded
+os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
 
 
 # ── Text extraction ────────────────────────────────────────────────────────
@@ -75,27 +127,28 @@ def extract_md(path: Path) -> str:
     """
     Read a Mathpix markdown file.
     Strips markdown syntax characters that add noise without semantic value
-    (heading hashes, bold/italic markers, horizontal rules) while preserving
-    LaTeX math inline and block expressions, which carry scientific meaning.
+    (bold/italic markers, horizontal rules) while preserving LaTeX math inline
+    and block expressions, which carry scientific meaning. Heading lines keep
+    their hashes so the chunker can follow sections; it strips them itself.
     """
     text = path.read_text(encoding="utf-8", errors="ignore")
 
-    # Keep LaTeX math but protect it from stripping (placeholder swap)
+    # Keep LaTeX math but protect it from stripping (placeholder swap).
+    # Private-use delimiters, so the _underline_ rule cannot eat them.
     # Block math: $$...$$
     block_math, inline_math = [], []
     def save_block(m):
         block_math.append(m.group(0))
-        return f"__BLOCKMATH{len(block_math)-1}__"
+        return f"\ue000BLOCKMATH{len(block_math)-1}\ue001"
     def save_inline(m):
         inline_math.append(m.group(0))
-        return f"__INLINEMATH{len(inline_math)-1}__"
+        return f"\ue000INLINEMATH{len(inline_math)-1}\ue001"
 
     import re
     text = re.sub(r"\$\$[\s\S]*?\$\$", save_block, text)
     text = re.sub(r"\$[^$\n]+?\$", save_inline, text)
 
     # Strip markdown syntax
-    text = re.sub(r"^#{1,6}\s+", "", text, flags=re.MULTILINE)  # headings
     text = re.sub(r"\*{1,3}([^*]+)\*{1,3}", r"\1", text)        # bold/italic
     text = re.sub(r"_{1,2}([^_]+)_{1,2}", r"\1", text)          # underline
     text = re.sub(r"^[-*]{3,}\s*$", "", text, flags=re.MULTILINE)  # hr
@@ -106,36 +159,206 @@ def extract_md(path: Path) -> str:
 
     # Restore math
     for i, m in enumerate(inline_math):
-        text = text.replace(f"__INLINEMATH{i}__", m)
+        text = text.replace(f"\ue000INLINEMATH{i}\ue001", m)
     for i, m in enumerate(block_math):
-        text = text.replace(f"__BLOCKMATH{i}__", m)
+        text = text.replace(f"\ue000BLOCKMATH{i}\ue001", m)
 
     return text
 
 
 # ── Chunking ───────────────────────────────────────────────────────────────
+# Blocks of the extracted text: $$ math $$, markdown headings, and the
+# paragraphs between blank lines. All offsets index into the extracted text.
+BLOCK_RE     = re.compile(r"\$\$[\s\S]*?\$\$|^#{1,6}[ \t]+[^\n]*|\n[ \t]*\n", re.MULTILINE)
+HEADING_RE   = re.compile(r"^(#{1,6})[ \t]+(.*?)[ \t#]*$", re.MULTILINE)
+SENTENCE_RE  = re.compile(r"(?<=[.!?])\s+")
+MIN_CHUNK_CHARS  = 80   # shorter chunks carry too little to retrieve on
+MIN_CHUNK_TOKENS = 32   # smaller sections are merged into the next one
+
+_tokenizer = None
+
+
+def get_tokenizer():
+    """The embedding model's tokenizer, loaded once per process (workers included)."""
+    global _tokenizer
+    if _tokenizer is None:
+        from transformers import AutoTokenizer
+        _tokenizer = AutoTokenizer.from_pretrained(EMBED_MODEL)
+    return _tokenizer
+
+
+def _blocks(text: str) -> Iterator[Tuple[str, int, int]]:
+    """(kind, start, end) for each heading, math block and paragraph, in order."""
+    def para(start, end):
+        seg = text[start:end]
+        if seg.strip():
+            yield "para", start + len(seg) - len(seg.lstrip()), end - len(seg) + len(seg.rstrip())
+
+    pos = 0
+    for m in BLOCK_RE.finditer(text):
+        yield from para(pos, m.start())
+        if m.group(0).startswith("$$"):
+            yield "math", m.start(), m.end()
+        elif m.group(0).startswith("#"):
+            yield "heading", m.start(), m.end()
+        pos = m.end()
+    yield from para(pos, len(text))
+
+
+def _pieces(text: str, tok, limit: int) -> Iterator[Tuple[str, int, int, int]]:
+    """(kind, start, end, tokens) units no longer than `limit` tokens.
+
+    Blocks that fit are yielded whole; longer paragraphs are split into
+    sentences, and anything still too long (math included) into token windows.
+    """
+    def count(start, end):
+        return len(tok(text[start:end], add_special_tokens=False)["input_ids"])
+
+    def windows(start, end):
+        offsets = tok(text[start:end], add_special_tokens=False,
+                      return_offsets_mapping=True)["offset_mapping"]
+        for i in range(0, len(offsets), limit):
+            window = offsets[i : i + limit]
+            yield "para", start + window[0][0], start + window[-1][1], len(window)
+
+    for kind, start, end in _blocks(text):
+        n = count(start, end)
+        if kind == "heading" or n <= limit:
+            yield kind, start, end, n
+        elif kind == "math":
+            yield from windows(start, end)
+        else:
+            pos = start
+            for m in [*SENTENCE_RE.finditer(text, start, end), None]:
+                stop = m.start() if m else end
+                if stop > pos:
+                    n = count(pos, stop)
+                    if n <= limit:
+                        yield "para", pos, stop, n
+                    else:
+                        yield from windows(pos, stop)
+                pos = m.end() if m else end
+
+
+def _chunk(text: str, buf: List[Tuple[int, int, int, bool]], path: List[str]) -> Dict:
+    start, end = buf[0][0], buf[-1][1]
+    return {
+        "text": HEADING_RE.sub(r"\2", text[start:end]).strip(),
+        "section": " > ".join(path),
+        "char_start": start,
+        "char_end": end,
+        "tokens": sum(p[2] for p in buf),
+    }
+
+
+def iter_chunks(text: str, chunk_size: int = CHUNK_SIZE,
+                overlap: int = CHUNK_OVERLAP) -> Iterator[Dict]:
+    """Stream token-bounded chunks that follow headings, paragraphs and math.
+
+    A heading closes the current chunk (unless it is still tiny) and updates
+    the section path recorded for the chunks that follow. Within a section,
+    pieces are packed up to `chunk_size` tokens; the last pieces of a full
+    chunk, up to `overlap` tokens, open the next one, as far as the next
+    piece still fits. No chunk exceeds the limit.
+    """
+    tok = get_tokenizer()
+    limit = max(MIN_CHUNK_TOKENS, min(chunk_size, tok.model_max_length - 2))  # room for [CLS]/[SEP]
+    overlap = min(overlap, limit // 2)
+
+    path: List[str] = []
+    buf: List[Tuple[int, int, int, bool]] = []   # (start, end, tokens, is_body) per piece
+    used = 0
+
+    def has_body():
+        return any(p[3] for p in buf)
+
+    for kind, start, end, n in _pieces(text, tok, limit):
+        if kind == "heading":
+            if has_body() and used >= MIN_CHUNK_TOKENS:
+                yield _chunk(text, buf, path)
+                buf, used = [], 0
+            heading = HEADING_RE.match(text, start)
+            del path[len(heading.group(1)) - 1:]
+            path.append(heading.group(2))
+            if n > limit:
+                continue            # absurdly long title: keep it in the path only
+        elif has_body() and used + n > limit:
+            yield _chunk(text, buf, path)
+            tail, carried = [], 0
+            for piece in reversed(buf):
+                if carried + piece[2] > overlap:
+                    break
+                tail.insert(0, piece)
+                carried += piece[2]
+            buf, used = tail, carried
+        # Make room for the piece: drop carried/buffered pieces from the front
+        while buf and used + n > limit:
+            used -= buf.pop(0)[2]
+        buf.append((start, end, n, kind != "heading"))
+        used += n
+
+    if has_body():
+        yield _chunk(text, buf, path)
+
+
 def chunk_text(text: str, chunk_size: int = CHUNK_SIZE,
-               overlap: int = CHUNK_OVERLAP) -> List[str]:
-    """Split on words with overlap, skip short/empty chunks."""
-    words = text.split()
-    chunks, i = [], 0
-    while i < len(words):
-        chunk = " ".join(words[i : i + chunk_size])
-        if len(chunk.strip()) > 80:
-            chunks.append(chunk.strip())
-        i += chunk_size - overlap
-    return chunks
+               overlap: int = CHUNK_OVERLAP) -> List[Dict]:
+    """Chunks with metadata, skipping ones too short to be useful."""
+    return [c for c in iter_chunks(text, chunk_size, overlap) if len(c["text"]) > MIN_CHUNK_CHARS]
+
+
+# ── Extraction worker (runs in the process pool) ──────────────────────────
+def extract_text(path: Path) -> str:
+    """Dispatch by file type."""
+    suffix = path.suffix.lower()
+    if suffix == ".md":
+        return extract_md(path)
+    if suffix == ".pdf":
+        return extract_pdf(path)
+    return extract_txt(path)
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def process_file(path: str, known_hash: Optional[str] = None) -> Dict:
+    """Hash, extract and chunk one file. Top-level so the process pool can pickle it.
+
+    If the content hash equals `known_hash` (file touched but not edited),
+    extraction is skipped and the result is marked unchanged.
+    """
+    fpath = Path(path)
+    t0 = time.perf_counter()
+    digest = file_hash(fpath)
+    if digest == known_hash:
+        return {"path": path, "sha256": digest, "unchanged": True, "empty": False,
+                "chunks": [], "extract_s": time.perf_counter() - t0, "chunk_s": 0.0}
+    text = extract_text(fpath)
+    t1 = time.perf_counter()
+    chunks = chunk_text(text) if text.strip() else []
+    return {
+        "path": path,
+        "sha256": digest,
+        "unchanged": False,
+        "empty": not text.strip(),
+        "chunks": chunks,
+        "extract_s": t1 - t0,
+        "chunk_s": time.perf_counter() - t1,
+    }
 
 
 # ── Embedding model ────────────────────────────────────────────────────────
-def load_embed_model():
-    from sentence_transformers import SentenceTransformer
-    console.log(f"Loading embedding model: [cyan]{EMBED_MODEL}[/]")
+def load_embed_model() -> Embedder:
+    console.log(f"Loading embedding model: [cyan]{EMBED_MODEL}[/] "
+                f"([dim]{EMBED_BACKEND}, {EMBED_THREADS} threads[/])")
     console.log("  [dim](first run downloads ~130 MB, then cached)[/]")
-    # Force CPU — avoids MPS (Apple Metal) OOM kills on unified memory Macs.
-    # BGE-small is 130 MB; CPU inference is fast enough and stable.
-    model = SentenceTransformer(EMBED_MODEL, device="cpu")
-    return model
+    # CPU only — BGE-small is 130 MB; batched CPU inference is fast and stable.
+    return Embedder.load(EMBED_MODEL)
 
 
 # ── ChromaDB ───────────────────────────────────────────────────────────────
@@ -156,8 +379,69 @@ def get_collection(reset: bool = False):
     return col
 
 
+# ── Manifest (incremental state) ──────────────────────────────────────────
+class Manifest:
+    """path → {size, mtime_ns, sha256, chunking, chunk_ids}, persisted as JSON next to the DB."""
+
+    SAVE_EVERY_S = 10.0
+
+    def __init__(self, path: Path, chunking: Dict):
+        self.path = path
+        self.chunking = chunking
+        self.files: Dict[str, Dict] = {}
+        self.rechunk = False
+        # Set while a pre-manifest DB is being re-indexed; cleared after a full pass
+        self.legacy_migration = False
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self.files = data.get("files", {})
+            self.legacy_migration = data.get("legacy_migration", False)
+            # Files chunked with other settings keep their ids (for deletion)
+            # but count as changed; checked per file, so an interrupted
+            # re-chunk resumes where it stopped
+            self.rechunk = any(not self.is_current(e) for e in self.files.values())
+        self._saved_at = time.monotonic()
+
+    @staticmethod
+    def key(fpath: Path) -> str:
+        return str(fpath.resolve())
+
+    @staticmethod
+    def chunk_ids(key: str, n: int) -> List[str]:
+        # Stable per path, so re-indexing a file overwrites its own ids only
+        prefix = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return [f"{prefix}_{i}" for i in range(n)]
+
+    def is_current(self, entry: Dict) -> bool:
+        return entry.get("chunking") == self.chunking
+
+    def is_unchanged(self, fpath: Path) -> bool:
+        entry = self.files.get(self.key(fpath))
+        if not entry or not self.is_current(entry):
+            return False
+        st = fpath.stat()
+        return entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+
+    def record(self, fpath: Path, sha256: str, chunk_ids: List[str]):
+        st = fpath.stat()
+        self.files[self.key(fpath)] = {
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+            "sha256": sha256, "chunking": self.chunking, "chunk_ids": chunk_ids,
+        }
+        if time.monotonic() - self._saved_at > self.SAVE_EVERY_S:
+            self.save()
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": 1, "legacy_migration": self.legacy_migration,
+                                   "files": self.files}), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._saved_at = time.monotonic()
+
+
 # ── Main ingestion ─────────────────────────────────────────────────────────
-def ingest(docs_path: Path, reset: bool, batch_size: int):
+def ingest(docs_path: Path, reset: bool, batch_size: int,
+           workers: int = WORKERS, queue_size: int = QUEUE_SIZE, use_cache: bool = True):
     if not docs_path.exists():
         console.print(f"[red]Docs folder not found: {docs_path}[/]")
         sys.exit(1)
@@ -190,121 +474,195 @@ def ingest(docs_path: Path, reset: bool, batch_size: int):
         f"PDF (.pdf): [bold]{len(pdf_files)}[/]\n"
         f"Docs path : [dim]{docs_path}[/]\n"
         f"Vector DB : [dim]{CHROMA_PATH}[/]\n"
-        f"Chunk sz  : [dim]{CHUNK_SIZE} words, overlap {CHUNK_OVERLAP}[/]\n"
-        f"Batch sz  : [dim]{batch_size} chunks per batch[/]",
+        f"Chunk sz  : [dim]≤{CHUNK_SIZE} tokens, overlap {CHUNK_OVERLAP}[/]\n"
+        f"Embedding : [dim]{EMBED_BACKEND}, {EMBED_THREADS} threads; writes of {batch_size} chunks[/]\n"
+        f"Workers   : [dim]{workers} extraction process(es), queue {queue_size}[/]",
         border_style="cyan"
     ))
 
     # Load models once
-    embed_model = load_embed_model()
-    collection  = get_collection(reset=reset)
-
-    # Pre-check already-indexed file names to allow incremental updates
-    existing_meta = collection.get(include=["metadatas"])
-    already_indexed = {
-        m.get("file_name", "") for m in (existing_meta.get("metadatas") or [])
-    }
-    if already_indexed:
-        console.log(f"[dim]{len(already_indexed)} file(s) already in DB — skipping them[/]")
-
-    total_chunks_added = 0
-    doc_id_counter = collection.count()
-
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        BarColumn(),
-        MofNCompleteColumn(),
-        TimeElapsedColumn(),
-        console=console,
-    ) as progress:
-
-        file_task = progress.add_task("Processing files", total=len(all_files))
-
-        for fpath in all_files:
-            progress.update(file_task, description=f"[cyan]{fpath.name[:40]}[/]")
+    embedder   = load_embed_model()
+    collection = get_collection(reset=reset)
+    cache = EmbeddingCache.open(embedder.cache_name, dim=embedder.dim) if use_cache else None
+
+    # Incremental state: O(1) per file, independent of collection size
+    if reset and MANIFEST_PATH.exists():
+        MANIFEST_PATH.unlink()
+    manifest = Manifest(MANIFEST_PATH, CHUNKING)
+    # A DB built before the manifest existed: drop each file's old chunks by
+    # path as it is re-indexed (one full pass, then incremental again). The
+    # flag is persisted so an interrupted pass resumes in the same mode.
+    if not manifest.files and collection.count() > 0:
+        manifest.legacy_migration = True
+        manifest.save()
+    legacy = manifest.legacy_migration
+    if legacy:
+        console.log("[yellow]DB predates the ingest manifest — re-indexing every file once.[/]")
+    elif manifest.rechunk:
+        console.log("[yellow]Chunk settings changed — re-chunking affected files once.[/]")
+
+    # Purge files that were removed from the docs folder
+    docs_root = str(docs_path.resolve()) + os.sep
+    present = {Manifest.key(f) for f in all_files}
+    removed = [k for k in manifest.files if k.startswith(docs_root) and k not in present]
+    for key in removed:
+        ids = manifest.files.pop(key)["chunk_ids"]
+        if ids:
+            collection.delete(ids=ids)
+        console.log(f"  [dim]Removed from DB (file deleted): {Path(key).name}[/]")
+
+    todo = [f for f in all_files if not manifest.is_unchanged(f)]
+    if len(all_files) > len(todo):
+        console.log(f"[dim]{len(all_files) - len(todo)} file(s) unchanged — skipping them[/]")
+
+    failed: List[str] = []
+    stats = {"files": 0, "chunks": 0, "tokens": 0, "extract_s": 0.0, "chunk_s": 0.0,
+             "embed_s": 0.0, "write_s": 0.0, "wait_s": 0.0, "blocked_s": 0.0}
+    started = time.perf_counter()
 
-            # Skip already-indexed files (incremental mode)
-            if fpath.name in already_indexed and not reset:
-                console.log(f"  [dim]Skip (already indexed): {fpath.name}[/]")
-                progress.advance(file_task)
-                continue
-
-            # Extract text — dispatch by file type
-            suffix = fpath.suffix.lower()
-            if suffix == ".md":
-                text = extract_md(fpath)
-            elif suffix == ".pdf":
-                text = extract_pdf(fpath)
-            else:
-                text = extract_txt(fpath)
-
-            if not text.strip():
-                console.log(f"  [yellow]Empty/unreadable: {fpath.name}[/]")
-                progress.advance(file_task)
-                continue
-
-            # Chunk
-            chunks = chunk_text(text)
-            if not chunks:
-                progress.advance(file_task)
-                continue
-
-            console.log(
-                f"  [green]{fpath.name}[/]: "
-                f"{len(chunks)} chunks → embedding in batches of {batch_size}"
-            )
-
-            # Embed and store in batches
-            chunk_task = progress.add_task(
-                f"  Embedding", total=len(chunks)
-            )
-
-            for i in range(0, len(chunks), batch_size):
-                batch_texts = chunks[i : i + batch_size]
-
-                # Embed — encode one-by-one inside the batch to cap peak RAM
-                embeddings = embed_model.encode(
-                    batch_texts,
-                    batch_size=4,            # sentence_transformers inner batch
-                    show_progress_bar=False,
-                    normalize_embeddings=True,
-                    convert_to_numpy=True,
-                ).tolist()
-
-                # Prepare ChromaDB records
-                ids  = [f"doc_{doc_id_counter + j}" for j in range(len(batch_texts))]
-                metas = [
-                    {
-                        "file_name": fpath.name,
-                        "file_path": str(fpath),
-                        "chunk_index": i + j,
-                        "total_chunks": len(chunks),
-                    }
-                    for j in range(len(batch_texts))
-                ]
-
-                collection.add(
-                    ids=ids,
-                    embeddings=embeddings,
-                    documents=batch_texts,
-                    metadatas=metas,
+    try:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            BarColumn(),
+            MofNCompleteColumn(),
+            TimeElapsedColumn(),
+            console=console,
+        ) as progress, ProcessPoolExecutor(max_workers=workers) as pool:
+
+            file_task = progress.add_task("Processing files", total=len(all_files))
+            progress.advance(file_task, len(all_files) - len(todo))
+
+            # Bounded hand-off: at most `queue_size` extracted files wait for the
+            # embedder, plus one in progress per worker. The feeder blocks on the
+            # semaphore until the consumer takes something off the queue.
+            results = queue.Queue()
+            slots = threading.Semaphore(workers + queue_size)
+
+            def feed():
+                for fpath in todo:
+                    t = time.perf_counter()
+                    slots.acquire()
+                    stats["blocked_s"] += time.perf_counter() - t
+                    entry = manifest.files.get(Manifest.key(fpath))
+                    known = entry["sha256"] if entry and manifest.is_current(entry) else None
+                    pool.submit(process_file, str(fpath), known) \
+                        .add_done_callback(lambda fut, path=str(fpath): results.put((path, fut)))
+
+            feeder = threading.Thread(target=feed, daemon=True)
+            feeder.start()
+
+            for _ in range(len(todo)):
+                t = time.perf_counter()
+                path, future = results.get()
+                stats["wait_s"] += time.perf_counter() - t
+                slots.release()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Not recorded in the manifest, so the next run retries it
+                    failed.append(path)
+                    console.log(f"  [red]Failed: {Path(path).name}: {type(e).__name__}: {e}[/]")
+                    progress.advance(file_task)
+                    continue
+
+                fpath = Path(result["path"])
+                key   = Manifest.key(fpath)
+                stats["extract_s"] += result["extract_s"]
+                stats["chunk_s"]   += result["chunk_s"]
+                stats["files"]     += 1
+                progress.update(file_task, description=f"[cyan]{fpath.name[:40]}[/]")
+
+                old = manifest.files.get(key)
+                if result["unchanged"]:
+                    # Touched but identical: refresh size/mtime, keep chunks
+                    manifest.record(fpath, result["sha256"], old["chunk_ids"])
+                    progress.advance(file_task)
+                    continue
+
+                # Changed or new: drop whatever this file had in the DB before
+                if old and old["chunk_ids"]:
+                    collection.delete(ids=old["chunk_ids"])
+                elif legacy:
+                    collection.delete(where={"file_path": str(fpath)})
+
+                chunks = result["chunks"]
+                if result["empty"] or not chunks:
+                    if result["empty"]:
+                        console.log(f"  [yellow]Empty/unreadable: {fpath.name}[/]")
+                    manifest.record(fpath, result["sha256"], [])
+                    progress.advance(file_task)
+                    continue
+
+                chunk_ids = Manifest.chunk_ids(key, len(chunks))
+                texts = [c["text"] for c in chunks]
+
+                console.log(f"  [green]{fpath.name}[/]: {len(chunks)} chunks")
+
+                # Embed the whole file at once (only chunks the cache has not
+                # seen for this model) so the engine can sort and batch them
+                t = time.perf_counter()
+                vectors = encode_cached(embedder.encode, cache, texts)
+                stats["embed_s"] += time.perf_counter() - t
+
+                chunk_task = progress.add_task(
+                    f"  Writing", total=len(chunks)
                 )
 
-                doc_id_counter   += len(batch_texts)
-                total_chunks_added += len(batch_texts)
-                progress.advance(chunk_task, len(batch_texts))
+                for i in range(0, len(chunks), batch_size):
+                    batch_texts = texts[i : i + batch_size]
+                    embeddings  = vectors[i : i + batch_size].tolist()
+
+                    # Prepare ChromaDB records
+                    ids  = chunk_ids[i : i + len(batch_texts)]
+                    metas = [
+                        {
+                            "file_name": fpath.name,
+                            "file_path": str(fpath),
+                            "chunk_index": i + j,
+                            "total_chunks": len(chunks),
+                            "section": c["section"],
+                            "char_start": c["char_start"],
+                            "char_end": c["char_end"],
+                            "tokens": c["tokens"],
+                        }
+                        for j, c in enumerate(chunks[i : i + batch_size])
+                    ]
+
+                    t = time.perf_counter()
+                    collection.upsert(
+                        ids=ids,
+                        embeddings=embeddings,
+                        documents=batch_texts,
+                        metadatas=metas,
+                    )
+                    stats["write_s"] += time.perf_counter() - t
+
+                    stats["chunks"] += len(batch_texts)
+                    stats["tokens"] += sum(m["tokens"] for m in metas)
+                    progress.advance(chunk_task, len(batch_texts))
+
+                progress.remove_task(chunk_task)
+                manifest.record(fpath, result["sha256"], chunk_ids)
+                progress.advance(file_task)
 
-                # Free memory between batches
-                del embeddings, batch_texts
-                gc.collect()
+            feeder.join()
+        # A failed file still needs its legacy chunks dropped when retried
+        if not failed:
+            manifest.legacy_migration = False
+    finally:
+        # Keep what finished, even if a later file failed
+        manifest.save()
 
-            progress.remove_task(chunk_task)
-            progress.advance(file_task)
+    print_pipeline_stats(stats, time.perf_counter() - started, workers)
 
     console.print(Panel(
         f"[bold green]Ingestion complete![/]\n\n"
-        f"  New chunks added  : [bold]{total_chunks_added}[/]\n"
+        f"  Files processed   : [bold]{stats['files']}[/]  removed: [bold]{len(removed)}[/]"
+        f"  failed: [bold{' red' if failed else ''}]{len(failed)}[/]\n"
+        f"  New chunks added  : [bold]{stats['chunks']}[/]"
+        + (f"  (avg {stats['tokens'] / stats['chunks']:.0f} tokens)" if stats["chunks"] else "")
+        + (f"  (embedded: [bold]{cache.misses}[/], from cache: [bold]{cache.hits}[/])\n" if cache else "\n") +
         f"  Total in DB       : [bold]{collection.count()}[/]\n"
         f"  Vector DB path    : [dim]{CHROMA_PATH}[/]\n\n"
         "[dim]Run [bold]python scripts/chat.py[/] to start chatting.",
@@ -313,15 +671,46 @@ def ingest(docs_path: Path, reset: bool, batch_size: int):
     ))
 
 
+def print_pipeline_stats(stats: Dict, wall_s: float, workers: int):
+    """Per-stage throughput. Extract/chunk times are summed over workers."""
+    def rate(n, secs):
+        return f"{n / secs:,.1f}" if secs > 0 else "—"
+
+    table = Table(title="Pipeline Throughput", border_style="cyan")
+    table.add_column("Stage",     style="bold")
+    table.add_column("Busy (s)",  justify="right")
+    table.add_column("Files/s",   justify="right")
+    table.add_column("Chunks/s",  justify="right", style="cyan")
+    extract_wall = (stats["extract_s"] + stats["chunk_s"]) / workers
+    table.add_row(f"Extract ({workers} proc)", f"{stats['extract_s']:.1f}",
+                  rate(stats["files"], extract_wall), "—")
+    table.add_row("Chunk", f"{stats['chunk_s']:.1f}", "—", rate(stats["chunks"], stats["chunk_s"] / workers))
+    table.add_row("Embed", f"{stats['embed_s']:.1f}", "—", rate(stats["chunks"], stats["embed_s"]))
+    table.add_row("Write", f"{stats['write_s']:.1f}", "—", rate(stats["chunks"], stats["write_s"]))
+    table.add_row("End to end", f"{wall_s:.1f}", rate(stats["files"], wall_s), rate(stats["chunks"], wall_s))
+    console.print(table)
+    # Which side is the bottleneck: a starved consumer waits on the queue,
+    # a saturated one makes the feeder block on a full queue.
+    console.log(f"[dim]Embedder waited {stats['wait_s']:.1f}s for extraction; "
+                f"extraction blocked {stats['blocked_s']:.1f}s on a full queue.[/]")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Ingest PDFs into the vector database")
     parser.add_argument("--docs-path",  type=Path, default=DOCS_PATH)
     parser.add_argument("--reset",      action="store_true",
                         help="Clear the DB before ingesting")
     parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
-                        help="Chunks per batch (lower = less RAM, default 32)")
+                        help=f"Chunks per ChromaDB write (default {BATCH_SIZE})")
+    parser.add_argument("--workers",    type=int, default=WORKERS,
+                        help="Extraction/chunking processes (default: cores - 1)")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="Extracted files buffered ahead of the embedder")
+    parser.add_argument("--no-cache",   action="store_true",
+                        help="Embed every chunk, ignoring the embedding cache")
     args = parser.parse_args()
-    ingest(args.docs_path, args.reset, args.batch_size)
+    ingest(args.docs_path, args.reset, args.batch_size,
+           max(1, args.workers), max(1, args.queue_size), not args.no_cache)
 
 
 if __name__ == "__main__":
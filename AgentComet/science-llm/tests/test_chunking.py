@@ -0,0 +1,66 @@
+"""Chunk limits of scripts/ingest.py, with a regex tokenizer standing in for the model's."""
+
+import random
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+import ingest  # noqa: E402
+
+
+class WordTokenizer:
+    """One token per word or punctuation mark, with character offsets."""
+    model_max_length = 512
+
+    def __call__(self, text, add_special_tokens=True, return_offsets_mapping=False, **kw):
+        spans = [m.span() for m in re.finditer(r"\w+|[^\w\s]", text)]
+        out = {"input_ids": list(range(len(spans)))}
+        if return_offsets_mapping:
+            out["offset_mapping"] = spans
+        return out
+
+
+@pytest.fixture(autouse=True)
+def tokenizer(monkeypatch):
+    monkeypatch.setattr(ingest, "_tokenizer", WordTokenizer())
+
+
+def paper(seed: int) -> str:
+    """Markdown with headings, sentences of mixed length, math and an oversized paragraph."""
+    rng = random.Random(seed)
+    def sentence():
+        return " ".join(f"w{rng.randint(0, 999)}" for _ in range(rng.choice([3, 8, 20, 45, 90]))) + "."
+    parts = ["# Title", ""]
+    for s in range(6):
+        parts += [f"## Section {s}", ""]
+        for _ in range(rng.randint(1, 5)):
+            parts += [" ".join(sentence() for _ in range(rng.randint(1, 12))), ""]
+        if s % 2:
+            parts += ["$$", " + ".join(f"x_{i}" for i in range(rng.randint(5, 400))), "$$", ""]
+    parts += [" ".join(["run"] * 1500), ""]
+    return "\n".join(parts)
+
+
+@pytest.mark.parametrize("chunk_size,overlap", [(64, 16), (128, 64), (384, 48), (384, 192), (600, 128)])
+@pytest.mark.parametrize("seed", range(5))
+def test_chunks_never_exceed_token_limit(chunk_size, overlap, seed):
+    tok = WordTokenizer()
+    limit = min(chunk_size, tok.model_max_length - 2)
+    chunks = list(ingest.iter_chunks(paper(seed), chunk_size, overlap))
+    assert chunks
+    for c in chunks:
+        assert c["tokens"] <= limit
+        assert len(tok(c["text"], add_special_tokens=False)["input_ids"]) <= limit
+
+
+def test_chunks_record_section_and_offsets():
+    text = "# Title\n\nIntro text that is long enough to stand alone as a chunk here.\n\n## Methods\n\n" \
+           + " ".join(["step"] * 50) + "\n"
+    chunks = ingest.chunk_text(text, 128, 16)
+    assert [c["section"] for c in chunks] == ["Title > Methods"]
+    c = chunks[0]
+    assert text[c["char_start"]:c["char_end"]].startswith("# Title")
+    assert c["text"].endswith("step")
@@ -16,23 +16,20 @@ from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 from PIL import Image
 
+from extractor import ExtractionError, ExtractorConfig, get_extractor
+
 # --- Load env & config ---
 load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 SECRET_KEY = os.getenv("FLASK_SECRET_KEY", os.urandom(24).hex())
 TIMEZONE = "America/New_York"
 
 if not OPENAI_API_KEY:
     print("WARNING: OPENAI_API_KEY not set. Add it to your .env")
 
-# OpenAI (Responses API)
-try:
-    from openai import OpenAI
-    oai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
-except Exception as e:
-    print("OpenAI SDK import error:", e)
-    oai_client = None
+# OpenAI (Responses API): one pooled client, created on the first extraction
+EXTRACTOR_CONFIG = ExtractorConfig.from_env()
+EXTRACTOR_CONFIG.timezone = TIMEZONE
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
@@ -140,85 +137,13 @@ def extract(image_id):
         flash("No masked image found. Please annotate first.", "error")
         return redirect(url_for("annotate", image_id=image_id))
 
-    # Encode masked image
-    with open(masked_path, "rb") as f:
-        b64 = base64.b64encode(f.read()).decode("utf-8")
-
-    system_prompt = (
-        "You are an expert scheduler. Extract **only** rehearsal/performance events that are visible in the image. "
-        "Ignore unrelated rows or text outside the brushed region. "
-        "Return each event with: title, date (YYYY-MM-DD), start_time (24h HH:MM), end_time (24h HH:MM), "
-        "location (if present), notes (free text if present). If end time is missing, infer a reasonable end by "
-        "adding 90 minutes. If date has no year, infer the most likely upcoming year based on today's date. "
-        f"Default timezone is {TIMEZONE}. Output must strictly follow the provided JSON schema."
-    )
-
-    # JSON schema for responses API
-    json_schema = {
-        "name": "events_schema",
-        "schema": {
-            "type": "object",
-            "properties": {
-                "events": {
-                    "type": "array",
-                    "items": {
-                        "type": "object",
-                        "properties": {
-                            "title": {"type": "string"},
-                            "date": {"type": "string", "pattern": r"^\d{4}-\d{2}-\d{2}$"},
-                            "start_time": {"type": "string", "pattern": r"^\d{2}:\d{2}$"},
-                            "end_time": {"type": "string", "pattern": r"^\d{2}:\d{2}$"},
-                            "location": {"type": "string"},
-                            "notes": {"type": "string"}
-                        },
-                        "required": ["title", "date", "start_time", "end_time"],
-                        "additionalProperties": False
-                    }
-                }
-            },
-            "required": ["events"],
-            "additionalProperties": False
-        }
-    }
-
     events_json = {"events": []}
 
-    if oai_client and OPENAI_API_KEY:
+    extractor = get_extractor(EXTRACTOR_CONFIG)
+    if extractor:
         try:
-            resp = oai_client.responses.create(
-                model=OPENAI_MODEL,
-                input=[
-                    {
-                        "role": "system",
-                        "content": [{"type": "input_text", "text": system_prompt}],
-                    },
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "input_text", "text": "Extract the rehearsal events from this image."},
-                            {"type": "input_image", "image_data": b64, "mime_type": "image/png"},
-                        ],
-                    },
-                ],
-                response_format={"type": "json_schema", "json_schema": json_schema},
-            )
-            # Responses API returns structured output under output[0].content[0].
-            content_blocks = resp.output[0].content if hasattr(resp, "output") else []
-            raw_json = None
-            for block in content_blocks:
-                if block.get("type") == "output_text":
-                    raw_json = block.get("text")
-                elif block.get("type") == "json":
-                    raw_json = block.get("json")
-            if raw_json is None:
-                # Fallback: try 'output_text' top-level
-                raw_json = getattr(resp, "output_text", None)
-
-            if isinstance(raw_json, str):
-                events_json = json.loads(raw_json)
-            elif isinstance(raw_json, dict):
-                events_json = raw_json
-        except Exception as e:
+            events_json = extractor.extract(masked_path)
+        except ExtractionError as e:
             print("OpenAI error:", e)
             flash(f"OpenAI error: {e}", "error")
     else:
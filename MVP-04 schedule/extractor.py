@@ -0,0 +1,187 @@
+import os
+import io
+import json
+import time
+import random
+import base64
+from datetime import date
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from PIL import Image
+
+# --- Prompt & schema (built once at import, shared by every request) ---
+
+def build_system_prompt(timezone: str) -> str:
+    return (
+        "You are an expert scheduler. Extract **only** rehearsal/performance events that are visible in the image. "
+        "Ignore unrelated rows or text outside the brushed region. "
+        "Return each event with: title, date (YYYY-MM-DD), start_time (24h HH:MM), end_time (24h HH:MM), "
+        "location (if present), notes (free text if present). If end time is missing, infer a reasonable end by "
+        "adding 90 minutes. If date has no year, infer the most likely upcoming year based on today's date. "
+        f"Default timezone is {timezone}. Output must strictly follow the provided JSON schema."
+    )
+
+EVENTS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "events": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "date": {"type": "string", "pattern": r"^\d{4}-\d{2}-\d{2}$"},
+                    "start_time": {"type": "string", "pattern": r"^\d{2}:\d{2}$"},
+                    "end_time": {"type": "string", "pattern": r"^\d{2}:\d{2}$"},
+                    "location": {"type": "string"},
+                    "notes": {"type": "string"}
+                },
+                "required": ["title", "date", "start_time", "end_time"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["events"],
+    "additionalProperties": False
+}
+
+# Responses API structured-output format
+TEXT_FORMAT = {"format": {"type": "json_schema", "name": "events_schema", "schema": EVENTS_SCHEMA, "strict": False}}
+
+@dataclass
+class ExtractorConfig:
+    api_key: str
+    model: str = "gpt-4o-mini"
+    timezone: str = "America/New_York"
+    timeout: float = 60.0          # seconds per attempt
+    connect_timeout: float = 5.0
+    max_retries: int = 3           # extra attempts after the first
+    backoff_base: float = 0.5      # seconds; doubles per attempt, with jitter
+    backoff_max: float = 8.0
+    max_connections: int = 20      # shared pool across request threads
+    max_image_side: int = 2048     # px; larger crops are downscaled before upload
+
+    @classmethod
+    def from_env(cls) -> "ExtractorConfig":
+        return cls(
+            api_key=os.getenv("OPENAI_API_KEY", ""),
+            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+            timeout=float(os.getenv("OPENAI_TIMEOUT", "60")),
+            max_retries=int(os.getenv("OPENAI_MAX_RETRIES", "3")),
+            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+            max_image_side=int(os.getenv("EXTRACT_MAX_IMAGE_SIDE", "2048")),
+        )
+
+class ExtractionError(Exception):
+    pass
+
+class ScheduleExtractor:
+    """Turns a masked schedule image into {"events": [...]} with one pooled OpenAI client.
+
+    Thread-safe: Flask request threads share one instance, its HTTP
+    connection pool and the prebuilt prompt/schema, so a request only pays
+    for preparing and sending its own image.
+    """
+
+    def __init__(self, config: ExtractorConfig):
+        import httpx
+        import openai
+
+        self.config = config
+        self.system_prompt = build_system_prompt(config.timezone)
+        self._openai = openai
+        self._retryable = (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+        # Retries are handled here (with our backoff), not inside the SDK.
+        self.client = openai.OpenAI(
+            api_key=config.api_key,
+            max_retries=0,
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            http_client=openai.DefaultHttpxClient(
+                limits=httpx.Limits(max_connections=config.max_connections, max_keepalive_connections=config.max_connections),
+            ),
+        )
+
+    # --- Image payload ---
+
+    def encode_image(self, path: str) -> str:
+        """PNG data URL of the brushed region only, downscaled to max_image_side."""
+        try:
+            with Image.open(path) as img:
+                img = img.convert("RGBA")
+                bbox = img.getchannel("A").getbbox()
+                if bbox:
+                    img = img.crop(bbox)
+                img.thumbnail((self.config.max_image_side, self.config.max_image_side))
+                buf = io.BytesIO()
+                img.save(buf, format="PNG", optimize=False)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            raise ExtractionError(f"Could not read image: {e}") from e
+        return "data:image/png;base64," + base64.b64encode(buf.getvalue()).decode("ascii")
+
+    # --- Model call ---
+
+    def _backoff(self, attempt: int, exc: Exception) -> float:
+        retry_after = getattr(getattr(exc, "response", None), "headers", {}).get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), self.config.backoff_max)
+            except ValueError:
+                pass
+        delay = min(self.config.backoff_base * (2 ** attempt), self.config.backoff_max)
+        return delay * (0.5 + random.random() / 2)
+
+    def _create(self, image_url: str):
+        user_text = f"Today is {date.today().isoformat()}. Extract the rehearsal events from this image."
+        for attempt in range(self.config.max_retries + 1):
+            try:
+                return self.client.responses.create(
+                    model=self.config.model,
+                    instructions=self.system_prompt,
+                    input=[{
+                        "role": "user",
+                        "content": [
+                            {"type": "input_text", "text": user_text},
+                            {"type": "input_image", "image_url": image_url, "detail": "auto"},
+                        ],
+                    }],
+                    text=TEXT_FORMAT,
+                )
+            except self._retryable as e:
+                if attempt == self.config.max_retries:
+                    raise ExtractionError(f"OpenAI request failed after {attempt + 1} attempts: {e}") from e
+                time.sleep(self._backoff(attempt, e))
+            except self._openai.OpenAIError as e:
+                raise ExtractionError(str(e)) from e
+
+    def extract(self, image_path: str) -> Dict[str, Any]:
+        resp = self._create(self.encode_image(image_path))
+        raw = getattr(resp, "output_text", None)
+        if not raw:
+            raise ExtractionError("Model returned no output text")
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ExtractionError(f"Model returned invalid JSON: {e}") from e
+        events = data.get("events", []) if isinstance(data, dict) else None
+        if not isinstance(events, list) or not all(isinstance(ev, dict) for ev in events):
+            raise ExtractionError("Model returned JSON that does not match the events schema")
+        return {"events": events}
+
+# --- Lazily created shared instance ---
+
+_extractor: Optional[ScheduleExtractor] = None
+
+def get_extractor(config: Optional[ExtractorConfig] = None) -> Optional[ScheduleExtractor]:
+    """Process-wide extractor, created on first use; None without an API key or SDK."""
+    global _extractor
+    if _extractor is None:
+        config = config or ExtractorConfig.from_env()
+        if not config.api_key:
+            return None
+        try:
+            _extractor = ScheduleExtractor(config)
+        except ImportError as e:
+            print("OpenAI SDK import error:", e)
+            return None
+    return _extractor
@@ -1,11 +1,58 @@
-from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel import create_engine, Session
+from sqlalchemy import event
 import os
 
+from . import migrations
+
 sqlite_path = os.getenv("SQLITE_PATH", "./app/data.db")
-engine = create_engine(f"sqlite:///{sqlite_path}", connect_args={"check_same_thread": False})
+DATABASE_URL = os.getenv("DATABASE_URL") or f"sqlite:///{sqlite_path}"
+DB_PROFILE = os.getenv("DB_PROFILE", "production")  # production | dev
+
+# Per-process pool: each uvicorn worker is its own process and runs sync
+# handlers on a threadpool (40 threads by default), so size for that.
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "30"))
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",        # readers no longer block behind a writer
+    "synchronous": "NORMAL",      # safe with WAL, avoids an fsync per commit
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_KB", "65536")),  # negative = KiB
+    "temp_store": "MEMORY",
+}
+
+def _make_engine(url: str):
+    kwargs = {}
+    if DB_PROFILE == "production":
+        kwargs.update(pool_size=POOL_SIZE, max_overflow=POOL_MAX_OVERFLOW, pool_timeout=30)
+    if url.startswith("sqlite"):
+        kwargs["connect_args"] = {"check_same_thread": False}
+    else:
+        kwargs["pool_pre_ping"] = True
+    eng = create_engine(url, **kwargs)
+    if url.startswith("sqlite") and DB_PROFILE == "production":
+        @event.listens_for(eng, "connect")
+        def _set_sqlite_pragmas(dbapi_conn, _record):
+            cur = dbapi_conn.cursor()
+            for name, value in SQLITE_PRAGMAS.items():
+                cur.execute(f"PRAGMA {name}={value}")
+            cur.close()
+    return eng
+
+engine = _make_engine(DATABASE_URL)
 
 def init_db():
-    SQLModel.metadata.create_all(engine)
+    """Bring the schema up to date. Run once per process, from app startup or scripts."""
+    return migrations.migrate(engine)
+
+def check_ready() -> bool:
+    """True when the database answers and is at the latest schema version."""
+    try:
+        with engine.connect() as conn:
+            return migrations.current_version(conn) >= migrations.LATEST
+    except Exception:
+        return False
 
 def get_session():
     with Session(engine) as session:
@@ -2,10 +2,15 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from passlib.context import CryptContext
+from sqlalchemy import event, inspect
 from sqlmodel import Session, select
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import asyncio
 import os
 
+from .cache import TTLCache
 from .db import get_session
 from .models import User
 
@@ -16,18 +21,54 @@ JWT_SECRET = os.getenv("JWT_SECRET", "dev")
 JWT_ALG = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "43200"))
 
+# bcrypt is deliberately slow CPU work. It gets its own small pool so a burst
+# of logins can neither block the event loop nor take every threadpool worker
+# that sync endpoints (reads) need.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+
+# Authenticated principals keyed by token subject. Entries are detached copies,
+# so they outlive the session that loaded them. Local User changes evict
+# immediately; changes made in other worker processes show up within the TTL.
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+_principals = TTLCache(maxsize=10_000, ttl=PRINCIPAL_CACHE_TTL)
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
-def create_access_token(sub: str) -> str:
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_hash_pool, hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(_hash_pool, verify_password, password, hashed)
+
+def create_access_token(sub: str, uid: Optional[int] = None) -> str:
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {"sub": sub, "exp": expire}
+    if uid is not None:
+        to_encode["uid"] = uid  # turns a cache miss into a primary-key lookup
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALG)
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_principal(_mapper, _connection, target: User):
+    _principals.delete(target.email)
+    for old_email in inspect(target).attrs.email.history.deleted or ():
+        _principals.delete(old_email)
+
+def _load_principal(session: Session, email: str, uid: Optional[int]) -> Optional[User]:
+    if uid is not None:
+        user = session.get(User, uid)
+        if user and user.email == email:
+            return user
+    return session.exec(select(User).where(User.email == email)).first()
+
+# Sync on purpose: FastAPI runs it in the threadpool, so a cache miss never
+# blocks the event loop.
+def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -40,7 +81,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme), session: Session
             raise credentials_exception
     except JWTError:
         raise credentials_exception
-    user = session.exec(select(User).where(User.email == email)).first()
-    if not user:
-        raise credentials_exception
+    user = _principals.get(email)
+    if user is None:
+        found = _load_principal(session, email, payload.get("uid"))
+        if not found:
+            raise credentials_exception
+        user = User(**found.model_dump())  # column-only detached copy, safe to share
+        _principals.set(email, user)
     return user
@@ -0,0 +1,100 @@
+"""Image renditions, built in a process pool off the request path.
+
+Renditions are named by content hash, so re-uploading the same bytes is a
+no-op and a URL can be handed out before the files exist. Workers write to a
+local staging dir; finished files are then handed to the blob store.
+"""
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from threading import Lock
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+
+from . import storage
+from .cache import TTLCache
+
+# name -> longest edge in px, largest first (each one is downscaled from the last)
+RENDITIONS = {"full": 2048, "medium": 1024, "thumb": 320}
+WEBP_QUALITY = 82
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_jobs: Dict[str, Future] = {}
+_failed = TTLCache(maxsize=1024, ttl=3600)
+_lock = Lock()
+
+def rendition_name(digest: str, name: str) -> str:
+    return f"{digest}_{name}.webp"
+
+def probe(path: str) -> bool:
+    """Cheap validity check: parses the header only, no pixel decoding."""
+    try:
+        with Image.open(path) as im:
+            im.verify()
+        return True
+    except Exception:
+        return False
+
+def build_renditions(src: str, staging_dir: str, digest: str) -> Dict[str, str]:
+    """Runs in a worker process. Returns {blob name: staged path}."""
+    staged = {}
+    try:
+        with Image.open(src) as im:
+            im = ImageOps.exif_transpose(im)
+            im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+            for name, edge in RENDITIONS.items():
+                im.thumbnail((edge, edge))
+                blob = rendition_name(digest, name)
+                dst = os.path.join(staging_dir, blob)
+                im.save(dst, "WEBP", quality=WEBP_QUALITY, method=4)
+                staged[blob] = dst
+    finally:
+        os.remove(src)
+    return staged
+
+def _ready(digest: str) -> bool:
+    store = storage.get_store()
+    return all(store.size(rendition_name(digest, n)) is not None for n in RENDITIONS)
+
+def _on_done(digest: str, fut: Future):
+    try:
+        # "full" goes last: once it exists, every rendition does.
+        for blob, path in sorted(fut.result().items(), key=lambda kv: kv[0].endswith("_full.webp")):
+            storage.get_store().put(blob, path)
+    except Exception as e:
+        _failed.set(digest, str(e))
+    finally:
+        with _lock:
+            _jobs.pop(digest, None)
+
+def submit(src: str, staging_dir: str, digest: str):
+    """Queue rendition building for an uploaded file; `src` is consumed."""
+    global _pool
+    with _lock:
+        if digest in _jobs or _ready(digest):
+            os.remove(src)
+            return
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+        _failed.delete(digest)
+        fut = _pool.submit(build_renditions, src, staging_dir, digest)
+        _jobs[digest] = fut
+    fut.add_done_callback(lambda f: _on_done(digest, f))
+
+def status(digest: str) -> Optional[str]:
+    """pending | ready | failed, or None if this digest is unknown."""
+    with _lock:
+        if digest in _jobs:
+            return "pending"
+    if _failed.get(digest) is not None:
+        return "failed"
+    # Checked in the store so any worker process can answer for any upload.
+    return "ready" if _ready(digest) else None
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -0,0 +1,230 @@
+"""Bulk import of locations and posts from CSV or GeoJSON.
+
+    python -m app.importer locations pois.geojson [--kind restaurant]
+    python -m app.importer locations pois.csv           # title,kind,lat,lon[,address,description,created_by_id]
+    python -m app.importer posts posts.csv --author-id 1  # location_id,content[,author_id,tags,photo_url,created_at]
+
+Rows are streamed and inserted with executemany in batches, all in one
+transaction, so a failed import leaves the database untouched. Secondary
+indexes and the R*Tree/FTS sync triggers are dropped for the duration and
+rebuilt once at the end; derived rows (PostTag, Blob refcounts) are filled in
+with set-based statements instead of per-row mapper events.
+
+GeoJSON may be a FeatureCollection (read whole) or newline-delimited
+features (.geojsonl/.ndjson, streamed). Response caches are invalidated when
+RESPONSE_CACHE_URL is shared; in-memory caches of running workers expire on
+their TTL.
+"""
+import argparse
+import csv
+import json
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import func, select, text
+
+from . import response_cache, search, spatial, storage, tags
+from .models import Location, Post, PostTag
+
+BATCH_SIZE = 10_000
+
+# ── Row readers ──
+
+def _opt(value) -> Optional[str]:
+    value = (value or "").strip() if isinstance(value, str) else value
+    return value or None
+
+def read_location_csv(path: str, default_kind: str) -> Iterator[dict]:
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield {
+                "title": row.get("title") or row.get("name"),
+                "kind": _opt(row.get("kind")) or default_kind,
+                "lat": float(row["lat"]),
+                "lon": float(row["lon"]),
+                "address": _opt(row.get("address")),
+                "description": _opt(row.get("description")),
+                "created_by_id": int(row["created_by_id"]) if _opt(row.get("created_by_id")) else None,
+            }
+
+def _features(path: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".geojsonl", ".ndjson", ".jsonl")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            doc = json.load(f)
+            yield from doc["features"] if doc.get("type") == "FeatureCollection" else [doc]
+
+def read_location_geojson(path: str, default_kind: str) -> Iterator[dict]:
+    for feat in _features(path):
+        geom = feat.get("geometry") or {}
+        if geom.get("type") != "Point":
+            continue
+        lon, lat = geom["coordinates"][:2]
+        props = feat.get("properties") or {}
+        title = props.get("title") or props.get("name")
+        if not title:
+            continue
+        yield {
+            "title": title,
+            "kind": props.get("kind") or default_kind,
+            "lat": float(lat),
+            "lon": float(lon),
+            "address": _opt(props.get("address")),
+            "description": _opt(props.get("description")),
+            "created_by_id": props.get("created_by_id"),
+        }
+
+def read_post_csv(path: str, default_author: Optional[int]) -> Iterator[dict]:
+    now = datetime.utcnow()
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            author = int(row["author_id"]) if _opt(row.get("author_id")) else default_author
+            if author is None:
+                raise ValueError("posts need an author_id column or --author-id")
+            created = _opt(row.get("created_at"))
+            yield {
+                "location_id": int(row["location_id"]),
+                "author_id": author,
+                "content": row["content"],
+                "tags": _opt(row.get("tags")),
+                "photo_url": _opt(row.get("photo_url")),
+                "created_at": datetime.fromisoformat(created) if created else now,
+            }
+
+# ── Deferred indexes ──
+
+_TRIGGERS = {
+    "location": ["location_rtree_ai", "location_fts_ai"],
+    "post": ["post_fts_ai"],
+}
+
+def _defer_indexes(conn, table):
+    """Drop secondary indexes and insert triggers on `table`; returns the dropped indexes."""
+    dropped = [ix for ix in table.indexes if not ix.unique]
+    for ix in dropped:
+        ix.drop(conn, checkfirst=True)
+    if conn.dialect.name == "sqlite":
+        for name in _TRIGGERS.get(table.name, []):
+            conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+    return dropped
+
+def _rebuild_location(conn, first_id: int):
+    if conn.dialect.name == "sqlite":
+        conn.execute(text("INSERT INTO location_rtree SELECT id, lon, lon, lat, lat FROM location WHERE id >= :i"), {"i": first_id})
+        conn.execute(text(
+            "INSERT INTO location_fts(rowid, title, description, address) "
+            "SELECT id, title, description, address FROM location WHERE id >= :i"), {"i": first_id})
+        spatial.install(conn)  # recreates the triggers; the index already exists so nothing is backfilled
+        for ddl in search.FTS_DDL:
+            conn.execute(text(ddl))
+
+def _rebuild_post(conn, first_id: int, fts: bool = True):
+    if fts and conn.dialect.name == "sqlite":
+        conn.execute(text("INSERT INTO post_fts(rowid, content, tags) SELECT id, content, tags FROM post WHERE id >= :i"), {"i": first_id})
+        for ddl in search.FTS_DDL:
+            conn.execute(text(ddl))
+    # Keyset pages over the new posts: bounded memory, and no cursor stays
+    # open on post while post_tag is written.
+    counts = Counter()
+    q = select(Post.id, Post.tags, Post.created_at, Post.photo_url).order_by(Post.id).limit(BATCH_SIZE)
+    after = first_id - 1
+    while True:
+        page = conn.execute(q.where(Post.id > after)).all()
+        if not page:
+            break
+        batch = []
+        for post_id, raw, created_at, url in page:
+            if raw is not None:
+                batch.extend(tags.tag_rows(post_id, raw, created_at))
+            digest = storage.digest_of(url) if url else None
+            if digest:
+                counts[digest] += 1
+        if batch:
+            conn.execute(PostTag.__table__.insert(), batch)
+        after = page[-1][0]
+    for digest, n in counts.items():
+        conn.execute(text(
+            "INSERT INTO blob (digest, refcount, created_at) VALUES (:d, :n, CURRENT_TIMESTAMP) "
+            "ON CONFLICT (digest) DO UPDATE SET refcount = blob.refcount + :n"
+        ), {"d": digest, "n": n})
+
+# ── Import ──
+
+def bulk_insert(engine, model, rows: Iterable[dict], progress=None, defer_indexes: bool = True) -> Dict[str, float]:
+    """Insert `rows` into `model`'s table in one transaction, by default with indexes deferred.
+
+    Deferring pays off for loads that are large next to the table; small
+    appends to a big table are cheaper with `defer_indexes=False`.
+    """
+    table = model.__table__
+    touched = set()
+    n = 0
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        first_id = (conn.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+        dropped = _defer_indexes(conn, table) if defer_indexes else []
+        batch: List[dict] = []
+        for row in rows:
+            batch.append(row)
+            if model is Post:
+                touched.add(row["location_id"])
+            if len(batch) >= BATCH_SIZE:
+                conn.execute(table.insert(), batch)
+                n += len(batch)
+                batch = []
+                if progress:
+                    progress(n, time.perf_counter() - start)
+        if batch:
+            conn.execute(table.insert(), batch)
+            n += len(batch)
+        loaded = time.perf_counter()
+        for ix in dropped:
+            ix.create(conn)
+        if defer_indexes:
+            (_rebuild_post if model is Post else _rebuild_location)(conn, first_id)
+        elif model is Post:
+            _rebuild_post(conn, first_id, fts=False)
+    done = time.perf_counter()
+
+    if model is Post:
+        response_cache.invalidate(*[t for loc in touched for t in (response_cache.posts_tag(loc), response_cache.detail_tag(loc))])
+    else:
+        response_cache.invalidate(response_cache.locations_tag())
+    return {
+        "rows": n,
+        "load_seconds": round(loaded - start, 3),
+        "index_seconds": round(done - loaded, 3),
+        "rows_per_second": round(n / (done - start), 1) if done > start else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import locations or posts")
+    parser.add_argument("what", choices=["locations", "posts"])
+    parser.add_argument("path", help=".csv, .geojson or newline-delimited .geojsonl")
+    parser.add_argument("--kind", default="poi", help="Location kind for rows that have none")
+    parser.add_argument("--author-id", type=int, help="Post author for rows without author_id")
+    parser.add_argument("--keep-indexes", action="store_true", help="Maintain indexes row by row (small appends)")
+    args = parser.parse_args()
+
+    if args.what == "locations":
+        model = Location
+        rows = (read_location_csv if args.path.endswith(".csv") else read_location_geojson)(args.path, args.kind)
+    else:
+        model = Post
+        rows = read_post_csv(args.path, args.author_id)
+
+    from .db import engine, init_db
+    init_db()
+    report = bulk_insert(engine, model, rows, progress=lambda n, s: print(f"  {n:>10,} rows  {n / s:>10,.0f} rows/s", end="\r"),
+                         defer_indexes=not args.keep_indexes)
+    print(" " * 40, end="\r")
+    print(f"{model.__tablename__}: {report['rows']:,} rows, load {report['load_seconds']:.2f}s, "
+          f"indexes {report['index_seconds']:.2f}s, {report['rows_per_second']:,.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
 import os
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 
-from .db import init_db
-from .routers import auth, locations, posts, comments, sessions, upload
+from . import images, metrics, realtime
+from .db import engine, init_db, check_ready
+from .pagination import NEXT_CURSOR_HEADER
+from .routers import auth, locations, clusters, posts, comments, sessions, upload, media, search, tags, events
 
 load_dotenv()
 
@@ -18,9 +21,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "Server-Timing"],
 )
+app.add_middleware(metrics.TimingMiddleware)
+metrics.instrument_engine(engine)
 
-# Static files for uploaded images
+# Static files (uploads from before /media, which serves new ones)
 static_dir = os.path.join(os.path.dirname(__file__), "static")
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
@@ -28,14 +34,38 @@ app.mount("/static", StaticFiles(directory=static_dir), name="static")
 def on_startup():
     init_db()
 
+@app.on_event("startup")
+async def start_realtime():
+    await realtime.broker.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    images.shutdown()
+    await realtime.broker.stop()
+
 # Routers
 app.include_router(auth.router)
 app.include_router(locations.router)
+app.include_router(clusters.router)
 app.include_router(posts.router)
 app.include_router(comments.router)
 app.include_router(sessions.router)
 app.include_router(upload.router)
+app.include_router(media.router)
+app.include_router(search.router)
+app.include_router(tags.router)
+app.include_router(events.router)
 
 @app.get("/healthz")
 def healthz():
     return {"ok": True}
+
+@app.get("/readyz")
+def readyz():
+    if not check_ready():
+        return JSONResponse({"ready": False}, status_code=503)
+    return {"ready": True}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,177 @@
+"""Request timing, per-request SQL accounting and a Prometheus-style /metrics.
+
+TimingMiddleware times every HTTP request up to the start of its response
+(so streams like /events count only their setup) and tags it with the
+matched route template. SQLAlchemy cursor events add each statement's
+count and time to the request that issued it; the per-request numbers go
+out as a Server-Timing header, and requests slower than SLOW_REQUEST_MS
+are logged to "mapsocial.slow" with their SQL.
+
+Counters are per process: with several workers each one serves its own
+/metrics, to be scraped (or summed) separately.
+"""
+import logging
+import os
+import time
+from contextvars import ContextVar
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_LOG_MAX_STATEMENTS = 50
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+log = logging.getLogger("mapsocial.slow")
+
+class RequestStats:
+    __slots__ = ("queries", "sql_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statements: List[Tuple[float, str]] = []
+
+# Set by the middleware; sync handlers see it too because the threadpool
+# copies the context, and they mutate the same RequestStats object.
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+class Registry:
+    def __init__(self):
+        self._lock = Lock()
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.queries: Dict[Tuple[str, str], int] = {}
+        self.sql_seconds: Dict[Tuple[str, str], float] = {}
+        self.slow: Dict[Tuple[str, str], int] = {}
+
+    def record(self, method: str, route: str, status: int, seconds: float, stats: RequestStats, slow: bool):
+        key = (method, route)
+        with self._lock:
+            rkey = (method, route, str(status))
+            self.requests[rkey] = self.requests.get(rkey, 0) + 1
+            self.latency.setdefault(key, Histogram()).observe(seconds)
+            self.queries[key] = self.queries.get(key, 0) + stats.queries
+            self.sql_seconds[key] = self.sql_seconds.get(key, 0.0) + stats.sql_seconds
+            if slow:
+                self.slow[key] = self.slow.get(key, 0) + 1
+
+    def render(self) -> str:
+        def labels(**kv):
+            return "{" + ",".join(f'{k}="{v}"' for k, v in kv.items()) + "}"
+
+        out = []
+        with self._lock:
+            out += ["# HELP http_requests_total Requests handled.", "# TYPE http_requests_total counter"]
+            for (m, r, s), n in sorted(self.requests.items()):
+                out.append(f"http_requests_total{labels(method=m, route=r, status=s)} {n}")
+            out += ["# HELP http_request_duration_seconds Time to response start.",
+                    "# TYPE http_request_duration_seconds histogram"]
+            for (m, r), h in sorted(self.latency.items()):
+                for bound, n in zip(BUCKETS, h.counts):
+                    out.append(f"http_request_duration_seconds_bucket{labels(method=m, route=r, le=bound)} {n}")
+                out.append(f"http_request_duration_seconds_bucket{labels(method=m, route=r, le='+Inf')} {h.total}")
+                out.append(f"http_request_duration_seconds_sum{labels(method=m, route=r)} {h.sum:.6f}")
+                out.append(f"http_request_duration_seconds_count{labels(method=m, route=r)} {h.total}")
+            out += ["# HELP db_queries_total SQL statements issued while serving requests.",
+                    "# TYPE db_queries_total counter"]
+            for (m, r), n in sorted(self.queries.items()):
+                out.append(f"db_queries_total{labels(method=m, route=r)} {n}")
+            out += ["# HELP db_query_seconds_total Time spent in SQL while serving requests.",
+                    "# TYPE db_query_seconds_total counter"]
+            for (m, r), s in sorted(self.sql_seconds.items()):
+                out.append(f"db_query_seconds_total{labels(method=m, route=r)} {s:.6f}")
+            out += [f"# HELP http_slow_requests_total Requests slower than {SLOW_REQUEST_MS:g} ms.",
+                    "# TYPE http_slow_requests_total counter"]
+            for (m, r), n in sorted(self.slow.items()):
+                out.append(f"http_slow_requests_total{labels(method=m, route=r)} {n}")
+        return "\n".join(out) + "\n"
+
+registry = Registry()
+
+# ── SQL accounting ──
+
+def instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, _cursor, _statement, _params, _context, _executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, _cursor, statement, _params, _context, _executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.sql_seconds += elapsed
+            if len(stats.statements) < SLOW_LOG_MAX_STATEMENTS:
+                stats.statements.append((elapsed, statement))
+
+# ── Middleware ──
+
+def _route_of(scope) -> str:
+    """Route template for labels; raw paths would make one series per id."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in scope:  # a Mount such as /static
+        return scope.get("root_path") or "mount"
+    return "unmatched"
+
+class TimingMiddleware:
+    """Pure ASGI middleware, so streaming responses and contextvars work unchanged."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        done = False
+
+        def finish(status: int) -> float:
+            nonlocal done
+            done = True
+            seconds = time.perf_counter() - start
+            slow = seconds * 1000 >= SLOW_REQUEST_MS
+            route = _route_of(scope)
+            registry.record(scope["method"], route, status, seconds, stats, slow)
+            if slow:
+                log.warning(
+                    "slow request %s %s (%s) %.1f ms, %d queries, %.1f ms in SQL\n%s",
+                    scope["method"], scope["path"], route, seconds * 1000, stats.queries, stats.sql_seconds * 1000,
+                    "\n".join(f"  {secs * 1000:8.2f} ms  {sql}" for secs, sql in stats.statements),
+                )
+            return seconds
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start" and not done:
+                seconds = finish(message["status"])
+                timing = f"app;dur={seconds * 1000:.1f}, db;dur={stats.sql_seconds * 1000:.1f};desc=\"{stats.queries} queries\""
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        except Exception:
+            if not done:
+                finish(500)
+            raise
+        finally:
+            _current.reset(token)
@@ -0,0 +1,117 @@
+"""Versioned schema migrations, applied once at startup (see db.init_db).
+
+Each migration runs at most once per database and is recorded in the
+schema_version table. Steps run under a migration lock and re-check the
+version, so workers starting together apply each step exactly once. Fresh databases get the full current schema from
+the first migration, so later steps must tolerate objects already existing.
+"""
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+from sqlalchemy import select, text
+from sqlmodel import SQLModel
+
+from . import search, spatial, storage, tags
+from .models import Blob, Post, PostTag, Comment, SessionEvent
+
+def _v1_initial(conn):
+    SQLModel.metadata.create_all(conn)
+    if conn.dialect.name == "sqlite":
+        spatial.install(conn)
+
+def _v2_keyset_indexes(conn):
+    for model in (Post, Comment, SessionEvent):
+        for index in model.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+def _v3_blob_refcounts(conn):
+    Blob.__table__.create(conn, checkfirst=True)
+    counts = {}
+    for (url,) in conn.execute(text("SELECT photo_url FROM post WHERE photo_url LIKE '/media/%'")):
+        digest = storage.digest_of(url)
+        if digest:
+            counts[digest] = counts.get(digest, 0) + 1
+    conn.execute(text("DELETE FROM blob"))
+    if counts:
+        conn.execute(
+            text("INSERT INTO blob (digest, refcount, created_at) VALUES (:d, :n, CURRENT_TIMESTAMP)"),
+            [{"d": d, "n": n} for d, n in counts.items()],
+        )
+
+def _v4_fulltext(conn):
+    if conn.dialect.name == "sqlite":
+        search.install(conn)
+
+def _v5_post_tags(conn):
+    PostTag.__table__.create(conn, checkfirst=True)
+    conn.execute(PostTag.__table__.delete())
+    batch = []
+    for post_id, raw, created_at in conn.execute(select(Post.id, Post.tags, Post.created_at).where(Post.tags.is_not(None))).all():
+        batch.extend(tags.tag_rows(post_id, raw, created_at))
+        if len(batch) >= 5000:
+            conn.execute(PostTag.__table__.insert(), batch)
+            batch = []
+    if batch:
+        conn.execute(PostTag.__table__.insert(), batch)
+
+def _v6_session_time_index(conn):
+    for index in SessionEvent.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+MIGRATIONS: List[Tuple[int, Callable]] = [
+    (1, _v1_initial),
+    (2, _v2_keyset_indexes),
+    (3, _v3_blob_refcounts),
+    (4, _v4_fulltext),
+    (5, _v5_post_tags),
+    (6, _v6_session_time_index),
+]
+LATEST = MIGRATIONS[-1][0]
+
+def current_version(conn) -> int:
+    conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar_one()
+
+# Arbitrary app-wide key for pg_advisory_xact_lock
+PG_LOCK_KEY = 0x6D617073
+# How long a starting worker waits for another one's migration (SQLite)
+SQLITE_LOCK_WAIT_MS = 10 * 60 * 1000
+
+@contextmanager
+def _locked(engine):
+    """A transaction that holds the migration lock until it commits.
+
+    SQLite: BEGIN IMMEDIATE takes the database write lock up front.
+    PostgreSQL: a transaction-scoped advisory lock.
+    """
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            timeout = conn.exec_driver_sql("PRAGMA busy_timeout").scalar()
+            conn.exec_driver_sql(f"PRAGMA busy_timeout = {SQLITE_LOCK_WAIT_MS}")
+            try:
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+            finally:
+                conn.exec_driver_sql(f"PRAGMA busy_timeout = {timeout}")
+        elif conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": PG_LOCK_KEY})
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+def migrate(engine) -> int:
+    with engine.begin() as conn:
+        version = current_version(conn)
+    if version >= LATEST:
+        return version
+    for target, step in MIGRATIONS:
+        with _locked(engine) as conn:
+            # Re-read under the lock: another worker may have applied it
+            version = current_version(conn)
+            if target <= version:
+                continue
+            step(conn)
+            conn.execute(text("INSERT INTO schema_version (version) VALUES (:v)"), {"v": target})
+            version = target
+    return version
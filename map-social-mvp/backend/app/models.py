@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Optional, List
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 class User(SQLModel, table=True):
@@ -27,6 +28,8 @@ class Location(SQLModel, table=True):
     posts: List["Post"] = Relationship(back_populates="location")
 
 class Post(SQLModel, table=True):
+    __table_args__ = (Index("ix_post_location_created", "location_id", "created_at", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     location_id: int = Field(foreign_key="location.id", index=True)
     author_id: int = Field(foreign_key="user.id", index=True)
@@ -39,7 +42,16 @@ class Post(SQLModel, table=True):
     author: "User" = Relationship(back_populates="posts")
     comments: List["Comment"] = Relationship(back_populates="post")
 
+class PostTag(SQLModel, table=True):
+    __table_args__ = (Index("ix_posttag_tag_created", "tag", "created_at", "post_id"),)
+
+    post_id: int = Field(foreign_key="post.id", primary_key=True)
+    tag: str = Field(primary_key=True)  # normalized, see tags.py
+    created_at: datetime  # copied from Post.created_at for feed ordering
+
 class Comment(SQLModel, table=True):
+    __table_args__ = (Index("ix_comment_post_created", "post_id", "created_at", "id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     post_id: int = Field(foreign_key="post.id", index=True)
     author_id: int = Field(foreign_key="user.id", index=True)
@@ -49,7 +61,17 @@ class Comment(SQLModel, table=True):
     post: "Post" = Relationship(back_populates="comments")
     author: "User" = Relationship(back_populates="comments")
 
+class Blob(SQLModel, table=True):
+    digest: str = Field(primary_key=True)  # see storage.py
+    refcount: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
 class SessionEvent(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_sessionevent_location_starts", "location_id", "starts_at", "id"),
+        Index("ix_sessionevent_starts", "starts_at", "location_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     location_id: int = Field(foreign_key="location.id", index=True)
     host_id: int = Field(foreign_key="user.id", index=True)
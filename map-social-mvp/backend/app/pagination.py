@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+from sqlmodel import Session
+
+# Keyset pagination over (sort column, id). List bodies stay plain arrays; the
+# opaque token for the next page is returned in this header.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+class Page:
+    """Query params shared by paginated list endpoints."""
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(default=None, description="Opaque token from X-Next-Cursor"),
+        limit: int = Query(default=50, ge=1, le=200),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+def encode_cursor(value: datetime, id: int) -> str:
+    raw = json.dumps([value.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        value, id = json.loads(raw)
+        return datetime.fromisoformat(value), int(id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(session: Session, q, sort_col, id_col, page: Page, response: Response, desc: bool = False) -> List:
+    """Apply keyset ordering to `q`, fetch one page and set the next-cursor header."""
+    key = tuple_(sort_col, id_col)
+    if page.cursor:
+        after = tuple_(*decode_cursor(page.cursor))
+        q = q.where(key < after if desc else key > after)
+    if desc:
+        q = q.order_by(sort_col.desc(), id_col.desc())
+    else:
+        q = q.order_by(sort_col.asc(), id_col.asc())
+    items = session.exec(q.limit(page.limit + 1)).all()
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        last = items[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(getattr(last, sort_col.key), last.id)
+    return items
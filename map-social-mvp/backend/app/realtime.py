@@ -0,0 +1,121 @@
+"""Push new posts, comments and sessions to subscribed clients (see routers/events.py).
+
+Writes call publish(). The broker hands every event to each worker's local
+hub, and the hub forwards it to the subscriptions that watch its location id
+or bbox. With PUBSUB_URL unset the broker is in-process, which fits a single
+worker. Set PUBSUB_URL=redis://... to fan out across workers.
+"""
+import asyncio
+import json
+import os
+from threading import Lock
+from typing import Iterable, Optional, Set
+
+from pydantic import BaseModel
+
+from .models import Location
+from .spatial import BBox
+
+PUBSUB_URL = os.getenv("PUBSUB_URL", "")
+PUBSUB_CHANNEL = "mapsocial:events"
+SUBSCRIBER_QUEUE_SIZE = 256
+
+class Subscription:
+    def __init__(self, location_ids: Iterable[int], box: Optional[BBox]):
+        self.location_ids = set(location_ids)
+        self.box = box
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def matches(self, event: dict) -> bool:
+        if event["location_id"] in self.location_ids:
+            return True
+        if self.box:
+            minLon, minLat, maxLon, maxLat = self.box
+            return minLon <= event["lon"] <= maxLon and minLat <= event["lat"] <= maxLat
+        return False
+
+    def offer(self, event: dict):
+        # Runs on the subscriber's loop. A slow client loses its oldest events
+        # rather than growing memory without bound.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+class Hub:
+    """This worker's subscriptions; fanout() is safe to call from any thread."""
+
+    def __init__(self):
+        self._subs: Set[Subscription] = set()
+        self._lock = Lock()
+
+    def add(self, sub: Subscription):
+        with self._lock:
+            self._subs.add(sub)
+
+    def remove(self, sub: Subscription):
+        with self._lock:
+            self._subs.discard(sub)
+
+    def fanout(self, event: dict):
+        with self._lock:
+            targets = [s for s in self._subs if s.matches(event)]
+        for s in targets:
+            s.loop.call_soon_threadsafe(s.offer, event)
+
+hub = Hub()
+
+class InProcessBroker:
+    def publish(self, event: dict):
+        hub.fanout(event)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+class RedisBroker:
+    """Redis pub/sub (or any server speaking the protocol); needs redis-py."""
+
+    def __init__(self, url: str):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError:
+            raise RuntimeError("PUBSUB_URL=redis://... requires redis (pip install redis)")
+        self._pub = redis.Redis.from_url(url)
+        self._sub = redis.asyncio.Redis.from_url(url)
+        self._task: Optional[asyncio.Task] = None
+
+    def publish(self, event: dict):
+        self._pub.publish(PUBSUB_CHANNEL, json.dumps(event))
+
+    async def _listen(self):
+        pubsub = self._sub.pubsub()
+        await pubsub.subscribe(PUBSUB_CHANNEL)
+        async for msg in pubsub.listen():
+            if msg["type"] == "message":
+                hub.fanout(json.loads(msg["data"]))
+
+    async def start(self):
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        await self._sub.aclose()
+
+broker = RedisBroker(PUBSUB_URL) if PUBSUB_URL else InProcessBroker()
+
+def publish(kind: str, location: Optional[Location], payload: BaseModel):
+    """Announce a created row to subscribers of its location."""
+    if location is None:
+        return
+    broker.publish({
+        "type": kind,
+        "location_id": location.id,
+        "lat": location.lat,
+        "lon": location.lon,
+        "data": payload.model_dump(mode="json"),
+    })
@@ -0,0 +1,137 @@
+"""Cached JSON responses for hot read endpoints, with ETag / If-None-Match.
+
+Entries are grouped by tags such as "loc:42:posts". Every tag has a version
+number that is part of the cache key. A write bumps the versions of the tags
+it touches, so exactly those entries stop matching and age out by TTL.
+
+The in-process backend is per worker, so other workers notice a bump only
+after the TTL. Set RESPONSE_CACHE_URL=redis://... to share one cache.
+"""
+import hashlib
+import json
+import os
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from .cache import TTLCache
+from .fastjson import RowsJSON
+from .pagination import NEXT_CURSOR_HEADER
+
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "")
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "30"))
+
+# Response headers that belong to the payload and are cached along with it
+_KEPT_HEADERS = (NEXT_CURSOR_HEADER,)
+
+def locations_tag() -> str:
+    return "locations"
+
+def posts_tag(location_id: int) -> str:
+    return f"loc:{location_id}:posts"
+
+def sessions_tag(location_id: int) -> str:
+    return f"loc:{location_id}:sessions"
+
+def detail_tag(location_id: int) -> str:
+    return f"loc:{location_id}:detail"
+
+def comments_tag(post_id: int) -> str:
+    return f"post:{post_id}:comments"
+
+class MemoryBackend:
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.entries = TTLCache(maxsize=10_000, ttl=ttl)
+        self.versions: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def versions_of(self, tags: List[str]) -> List[int]:
+        return [self.versions.get(t, 0) for t in tags]
+
+    def bump(self, tags: List[str]):
+        with self._lock:
+            for t in tags:
+                self.versions[t] = self.versions.get(t, 0) + 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.entries.get(key)
+
+    def set(self, key: str, value: bytes):
+        self.entries.set(key, value)
+
+class RedisBackend:
+    """Any Redis-protocol server (Redis, Valkey, KeyDB, ...); needs redis-py."""
+
+    def __init__(self, url: str, ttl: int):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_URL=redis://... requires redis (pip install redis)")
+        self.r = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def versions_of(self, tags: List[str]) -> List[int]:
+        return [int(v or 0) for v in self.r.mget([f"rc:v:{t}" for t in tags])]
+
+    def bump(self, tags: List[str]):
+        pipe = self.r.pipeline()
+        for t in tags:
+            pipe.incr(f"rc:v:{t}")
+        pipe.execute()
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.r.get(f"rc:e:{key}")
+
+    def set(self, key: str, value: bytes):
+        self.r.setex(f"rc:e:{key}", self.ttl, value)
+
+_backend = None
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if RESPONSE_CACHE_URL:
+            _backend = RedisBackend(RESPONSE_CACHE_URL, RESPONSE_CACHE_TTL)
+        else:
+            _backend = MemoryBackend(RESPONSE_CACHE_TTL)
+    return _backend
+
+def invalidate(*tags: str):
+    get_backend().bump(list(tags))
+
+def _pack(headers: Dict[str, str], body: bytes) -> bytes:
+    return json.dumps(headers).encode() + b"\n" + body
+
+def _unpack(raw: bytes) -> Tuple[Dict[str, str], bytes]:
+    head, body = raw.split(b"\n", 1)
+    return json.loads(head), body
+
+def cached_json(request: Request, tags: List[str], adapter: Union[TypeAdapter, RowsJSON], build: Callable[[Response], Any]) -> Response:
+    """Serve `build(response)` serialized with `adapter`, from cache when possible.
+
+    `build` gets a scratch Response for headers such as X-Next-Cursor. With a
+    RowsJSON adapter it returns row tuples instead of ORM objects.
+    """
+    backend = get_backend()
+    versions = backend.versions_of(tags)
+    key = request.url.path + "?" + str(request.query_params) + "|" + ",".join(f"{t}@{v}" for t, v in zip(tags, versions))
+    raw = backend.get(key)
+    if raw is None:
+        scratch = Response()
+        data = build(scratch)
+        if isinstance(adapter, RowsJSON):
+            body = adapter.dump_json(data)
+        else:
+            body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+        headers = {h: scratch.headers[h] for h in _KEPT_HEADERS if h in scratch.headers}
+        headers["ETag"] = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+        backend.set(key, _pack(headers, body))
+    else:
+        headers, body = _unpack(raw)
+    headers["Cache-Control"] = "no-cache"  # clients revalidate with If-None-Match
+    if headers["ETag"] in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
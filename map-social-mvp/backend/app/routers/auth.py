@@ -1,34 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlmodel import Session, select
 from fastapi.security import OAuth2PasswordRequestForm
 
-from ..db import get_session, init_db
+from ..db import get_session
 from ..models import User
 from ..schemas import UserCreate, UserPublic, Token
-from ..deps import hash_password, verify_password, create_access_token
+from ..deps import hash_password_async, verify_password_async, create_access_token, get_current_user
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+def _user_by_email(session: Session, email: str):
+    return session.exec(select(User).where(User.email == email)).first()
+
+def _save(session: Session, user: User) -> User:
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
+
+# Async handlers: DB work goes to the threadpool, bcrypt to its own pool (deps).
 @router.post("/register", response_model=UserPublic)
-def register(payload: UserCreate, session: Session = Depends(get_session)):
-    init_db()
-    existing = session.exec(select(User).where(User.email == payload.email)).first()
+async def register(payload: UserCreate, session: Session = Depends(get_session)):
+    existing = await run_in_threadpool(_user_by_email, session, payload.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
     user = User(
         email=payload.email,
         display_name=payload.display_name,
-        hashed_password=hash_password(payload.password),
+        hashed_password=await hash_password_async(payload.password),
     )
-    session.add(user)
-    session.commit()
-    session.refresh(user)
-    return user
+    return await run_in_threadpool(_save, session, user)
 
 @router.post("/token", response_model=Token)
-def token(form: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
-    user = session.exec(select(User).where(User.email == form.username)).first()
-    if not user or not verify_password(form.password, user.hashed_password):
+async def token(form: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
+    user = await run_in_threadpool(_user_by_email, session, form.username)
+    if not user or not await verify_password_async(form.password, user.hashed_password):
         raise HTTPException(status_code=400, detail="Incorrect email or password")
-    access = create_access_token(sub=user.email)
+    access = create_access_token(sub=user.email, uid=user.id)
     return Token(access_token=access)
+
+@router.get("/me", response_model=UserPublic)
+def me(current: User = Depends(get_current_user)):
+    return current
@@ -0,0 +1,101 @@
+import math
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import Integer, cast, func
+from sqlmodel import Session, select
+from ..cache import TTLCache
+from ..db import get_session
+from ..models import Location
+from ..response_cache import RESPONSE_CACHE_TTL, RESPONSE_CACHE_URL, get_backend, locations_tag
+from ..schemas import ClusterPublic
+from ..spatial import parse_bbox, within_bbox
+
+router = APIRouter(prefix="/clusters", tags=["clusters"])
+
+# The world is cut into 2^zoom x 2^zoom degree tiles, each split into a
+# CELLS_PER_TILE grid. Clusters never cross a tile edge, so per-tile aggregates
+# can be cached and reused as the viewport pans.
+CELLS_PER_TILE = 8
+
+# (locations version, zoom, kind, tx, ty) -> list of cluster dicts. Every
+# Location writer (API or importer) bumps the response-cache "locations" tag,
+# so tiles built before a write stop matching. That version is shared across
+# workers only with RESPONSE_CACHE_URL; with the in-process backend another
+# worker's write shows up after the TTL, so tiles then live no longer than
+# cached responses.
+_tiles = TTLCache(maxsize=4096, ttl=300 if RESPONSE_CACHE_URL else RESPONSE_CACHE_TTL)
+
+def _aggregate(session: Session, zoom: int, kind: Optional[str], tiles: List[Tuple[int, int]]) -> Dict[Tuple[int, int], List[dict]]:
+    """One GROUP BY over the union of the missing tiles, split back into tiles."""
+    tile = 360.0 / (1 << zoom)
+    cell = tile / CELLS_PER_TILE
+    txs = [t[0] for t in tiles]
+    tys = [t[1] for t in tiles]
+    box = (min(txs) * tile - 180, min(tys) * tile - 90, (max(txs) + 1) * tile - 180, (max(tys) + 1) * tile - 90)
+
+    # lon + 180 and lat + 90 are non-negative, so the integer cast is a floor.
+    cx = cast((Location.lon + 180) / cell, Integer).label("cx")
+    cy = cast((Location.lat + 90) / cell, Integer).label("cy")
+    q = select(cx, cy, Location.kind, func.count(), func.sum(Location.lat), func.sum(Location.lon), func.min(Location.id))
+    if kind:
+        q = q.where(Location.kind == kind)
+    q = within_bbox(q.select_from(Location), box, session.get_bind().dialect.name)
+    q = q.group_by(cx, cy, Location.kind)
+
+    cells: Dict[Tuple[int, int], dict] = {}
+    for x, y, k, n, slat, slon, first_id in session.exec(q):
+        c = cells.setdefault((x, y), {"count": 0, "slat": 0.0, "slon": 0.0, "kinds": {}, "location_id": first_id})
+        c["count"] += n
+        c["slat"] += slat
+        c["slon"] += slon
+        c["kinds"][k] = n
+
+    wanted = set(tiles)
+    out: Dict[Tuple[int, int], List[dict]] = {t: [] for t in tiles}
+    for (x, y), c in cells.items():
+        t = (x // CELLS_PER_TILE, y // CELLS_PER_TILE)
+        if t not in wanted:
+            continue  # neighbouring tile inside the union bbox; it stays uncached
+        out[t].append({
+            "lat": c["slat"] / c["count"],
+            "lon": c["slon"] / c["count"],
+            "count": c["count"],
+            "kinds": c["kinds"],
+            "location_id": c["location_id"] if c["count"] == 1 else None,
+        })
+    return out
+
+@router.get("", response_model=List[ClusterPublic])
+def list_clusters(
+    session: Session = Depends(get_session),
+    bbox: str = Query(description="minLon,minLat,maxLon,maxLat"),
+    zoom: int = Query(ge=0, le=20),
+    kind: Optional[str] = None,
+):
+    box = parse_bbox(bbox)
+    if not box:
+        raise HTTPException(status_code=400, detail="Invalid bbox")
+    minLon, minLat, maxLon, maxLat = box
+    n = 1 << zoom
+    tile = 360.0 / n
+    tx0 = max(0, math.floor((minLon + 180) / tile))
+    tx1 = min(n - 1, math.floor((maxLon + 180) / tile))
+    ty0 = max(0, math.floor((minLat + 90) / tile))
+    ty1 = min(n - 1, math.floor((maxLat + 90) / tile))
+    tiles = [(x, y) for x in range(tx0, tx1 + 1) for y in range(ty0, ty1 + 1)]
+    if len(tiles) > 256:
+        raise HTTPException(status_code=400, detail="Viewport too large for this zoom")
+
+    version = get_backend().versions_of([locations_tag()])[0]
+    result, missing = [], []
+    for t in tiles:
+        hit = _tiles.get((version, zoom, kind, *t))
+        if hit is None:
+            missing.append(t)
+        else:
+            result.extend(hit)
+    if missing:
+        for t, clusters in _aggregate(session, zoom, kind, missing).items():
+            _tiles.set((version, zoom, kind, *t), clusters)
+            result.extend(clusters)
+    return result
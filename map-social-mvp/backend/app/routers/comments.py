@@ -1,23 +1,33 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from typing import List
-from sqlmodel import Session, select
-from ..db import get_session, init_db
-from ..models import Comment, User
+from sqlmodel import Session
+from ..db import get_session
+from .. import realtime
+from ..models import Comment, Location, Post, User
 from ..schemas import CommentCreate, CommentPublic
 from ..deps import get_current_user
+from ..pagination import Page, paginate
+from ..response_cache import cached_json, invalidate, comments_tag, detail_tag
+from ..fastjson import RowsJSON
 
 router = APIRouter(prefix="/comments", tags=["comments"])
 
 @router.post("", response_model=CommentPublic)
 def create_comment(payload: CommentCreate, current: User = Depends(get_current_user), session: Session = Depends(get_session)):
-    init_db()
     c = Comment(**payload.dict(), author_id=current.id)
     session.add(c)
     session.commit()
     session.refresh(c)
+    post = session.get(Post, c.post_id)
+    invalidate(comments_tag(c.post_id), *([detail_tag(post.location_id)] if post else []))
+    if post:
+        realtime.publish("comment.created", session.get(Location, post.location_id), CommentPublic.model_validate(c))
     return c
 
+_comments_json = RowsJSON(Comment, CommentPublic)
+
 @router.get("", response_model=List[CommentPublic])
-def list_comments(post_id: int, session: Session = Depends(get_session)):
-    items = session.exec(select(Comment).where(Comment.post_id == post_id).order_by(Comment.created_at.asc())).all()
-    return items
+def list_comments(post_id: int, request: Request, page: Page = Depends(), session: Session = Depends(get_session)):
+    q = _comments_json.select().where(Comment.post_id == post_id)
+    return cached_json(request, [comments_tag(post_id)], _comments_json,
+                       lambda response: paginate(session, q, Comment.created_at, Comment.id, page, response))
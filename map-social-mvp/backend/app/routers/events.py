@@ -0,0 +1,42 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from .. import realtime
+from ..spatial import parse_bbox
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+KEEPALIVE_SECONDS = 15
+
+@router.get("")
+async def stream_events(
+    request: Request,
+    location_id: List[int] = Query(default=[], description="Repeat to watch several locations"),
+    bbox: Optional[str] = Query(default=None, description="minLon,minLat,maxLon,maxLat"),
+):
+    """Server-Sent Events feed of post.created / comment.created / session.created."""
+    box = parse_bbox(bbox)
+    if not location_id and not box:
+        raise HTTPException(status_code=400, detail="Subscribe to location_id(s) or a bbox")
+    if len(location_id) > 200:
+        raise HTTPException(status_code=400, detail="Too many location ids")
+    sub = realtime.Subscription(location_id, box)
+    realtime.hub.add(sub)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    ev = await asyncio.wait_for(sub.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {ev['type']}\ndata: {json.dumps(ev)}\n\n"
+        finally:
+            realtime.hub.remove(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
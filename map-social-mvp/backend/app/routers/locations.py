@@ -1,37 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
+from datetime import datetime
 from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import aliased, selectinload
 from sqlmodel import Session, select
-from ..db import get_session, init_db
-from ..models import Location, User
-from ..schemas import LocationCreate, LocationPublic
+from ..db import get_session
+from ..models import Location, User, Post, Comment, SessionEvent
+from ..schemas import LocationCreate, LocationPublic, LocationDetail, PostDetail, CommentPublic
 from ..deps import get_current_user
+from ..spatial import parse_bbox, within_bbox
+from ..response_cache import cached_json, invalidate, locations_tag, detail_tag
+from ..fastjson import RowsJSON
 
 router = APIRouter(prefix="/locations", tags=["locations"])
 
 @router.post("", response_model=LocationPublic)
 def create_location(payload: LocationCreate, current: User = Depends(get_current_user), session: Session = Depends(get_session)):
-    init_db()
     loc = Location(**payload.dict(), created_by_id=current.id)
     session.add(loc)
     session.commit()
     session.refresh(loc)
+    invalidate(locations_tag())
     return loc
 
+_locations_json = RowsJSON(Location, LocationPublic)
+_detail_json = TypeAdapter(LocationDetail)
+
 @router.get("", response_model=List[LocationPublic])
 def list_locations(
+    request: Request,
     session: Session = Depends(get_session),
     # Optional bbox search: minLon,minLat,maxLon,maxLat
     bbox: Optional[str] = Query(default=None, description="minLon,minLat,maxLon,maxLat"),
     kind: Optional[str] = None,
+    limit: int = Query(default=500, ge=1, le=5000),
 ):
-    q = select(Location)
+    q = _locations_json.select()
     if kind:
         q = q.where(Location.kind == kind)
-    locs = session.exec(q).all()
-    if bbox:
-        try:
-            minLon, minLat, maxLon, maxLat = [float(x) for x in bbox.split(",")]
-            locs = [l for l in locs if (minLon <= l.lon <= maxLon and minLat <= l.lat <= maxLat)]
-        except Exception:
-            pass
-    return locs
+    box = parse_bbox(bbox)
+    if box:
+        q = within_bbox(q, box, session.get_bind().dialect.name)
+    return cached_json(request, [locations_tag()], _locations_json, lambda _: session.exec(q.limit(limit)).all())
+
+@router.get("/{location_id}/detail", response_model=LocationDetail)
+def location_detail(
+    location_id: int,
+    request: Request,
+    session: Session = Depends(get_session),
+    posts_limit: int = Query(default=20, ge=1, le=100),
+    comments_per_post: int = Query(default=3, ge=0, le=20),
+    sessions_limit: int = Query(default=20, ge=1, le=100),
+):
+    """Everything the location drawer shows, in a fixed number of queries."""
+    return cached_json(request, [detail_tag(location_id)], _detail_json,
+                       lambda _: _load_detail(session, location_id, posts_limit, comments_per_post, sessions_limit))
+
+def _load_detail(session: Session, location_id: int, posts_limit: int, comments_per_post: int, sessions_limit: int) -> LocationDetail:
+    loc = session.get(Location, location_id)
+    if not loc:
+        raise HTTPException(status_code=404, detail="Location not found")
+
+    posts = session.exec(
+        select(Post)
+        .where(Post.location_id == location_id)
+        .options(selectinload(Post.author))
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .limit(posts_limit)
+    ).all()
+
+    # Counts and the first N comments of every post in one windowed query,
+    # rather than eager-loading whole threads through Post.comments.
+    counts, firsts = {}, {}
+    if posts:
+        rn = func.row_number().over(partition_by=Comment.post_id, order_by=(Comment.created_at, Comment.id)).label("rn")
+        total = func.count().over(partition_by=Comment.post_id).label("total")
+        ranked = select(Comment, rn, total).where(Comment.post_id.in_([p.id for p in posts])).subquery()
+        ranked_comment = aliased(Comment, ranked)
+        rows = session.exec(
+            select(ranked_comment, ranked.c.total)
+            .where(ranked.c.rn <= max(comments_per_post, 1))
+            .order_by(ranked.c.post_id, ranked.c.rn)
+        ).all()
+        for c, n in rows:
+            counts[c.post_id] = n
+            if comments_per_post:
+                firsts.setdefault(c.post_id, []).append(CommentPublic.model_validate(c))
+
+    sessions = session.exec(
+        select(SessionEvent)
+        .where(SessionEvent.location_id == location_id, SessionEvent.ends_at >= datetime.utcnow())
+        .order_by(SessionEvent.starts_at.asc(), SessionEvent.id.asc())
+        .limit(sessions_limit)
+    ).all()
+
+    return LocationDetail(
+        location=LocationPublic.model_validate(loc),
+        posts=[
+            PostDetail.model_validate(p).model_copy(update={
+                "comment_count": counts.get(p.id, 0),
+                "first_comments": firsts.get(p.id, []),
+            })
+            for p in posts
+        ],
+        upcoming_sessions=sessions,
+    )
@@ -0,0 +1,52 @@
+import re
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from .. import storage
+
+router = APIRouter(prefix=storage.MEDIA_URL, tags=["media"])
+
+# Blob names embed the content hash, so a URL never changes meaning.
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)")
+
+def _byte_range(header: str, size: int):
+    """(start, end) for a single-range header, None to serve it all; 416 if unsatisfiable."""
+    m = _RANGE_RE.fullmatch(header.strip())
+    if not m or not (m.group(1) or m.group(2)):
+        return None  # multi-range or malformed: ignore it and send the whole blob
+    if m.group(1):
+        start = int(m.group(1))
+        end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+    else:
+        start, end = max(0, size - int(m.group(2))), size - 1
+    if start > end or start >= size:
+        raise HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+@router.api_route("/{name}", methods=["GET", "HEAD"])
+def get_media(name: str, request: Request):
+    if not storage.BLOB_NAME_RE.fullmatch(name):
+        raise HTTPException(status_code=404, detail="Not found")
+    store = storage.get_store()
+    size = store.size(name)
+    if size is None:
+        raise HTTPException(status_code=404, detail="Not found")
+
+    etag = f'"{name.split(".")[0]}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+
+    start, end, status_code = 0, size - 1, 200
+    rng = request.headers.get("range")
+    if rng and request.headers.get("if-range", etag) == etag:
+        span = _byte_range(rng, size)
+        if span:
+            (start, end), status_code = span, 206
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+
+    if request.method == "HEAD" or size == 0:
+        return Response(status_code=status_code, headers=headers, media_type="image/webp")
+    return StreamingResponse(store.read(name, start, end), status_code=status_code, headers=headers, media_type="image/webp")
@@ -1,23 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import List
-from sqlmodel import Session, select
-from ..db import get_session, init_db
-from ..models import Post, User
+from sqlmodel import Session
+from ..db import get_session
+from .. import realtime
+from ..models import Location, Post, User
 from ..schemas import PostCreate, PostPublic
 from ..deps import get_current_user
+from ..pagination import Page, paginate
+from ..response_cache import cached_json, invalidate, posts_tag, detail_tag
+from ..fastjson import RowsJSON
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
 @router.post("", response_model=PostPublic)
 def create_post(payload: PostCreate, current: User = Depends(get_current_user), session: Session = Depends(get_session)):
-    init_db()
     post = Post(**payload.dict(), author_id=current.id)
     session.add(post)
     session.commit()
     session.refresh(post)
+    invalidate(posts_tag(post.location_id), detail_tag(post.location_id))
+    realtime.publish("post.created", session.get(Location, post.location_id), PostPublic.model_validate(post))
     return post
 
+_posts_json = RowsJSON(Post, PostPublic)
+
 @router.get("", response_model=List[PostPublic])
-def list_posts(location_id: int, session: Session = Depends(get_session)):
-    posts = session.exec(select(Post).where(Post.location_id == location_id).order_by(Post.created_at.desc())).all()
-    return posts
+def list_posts(location_id: int, request: Request, page: Page = Depends(), session: Session = Depends(get_session)):
+    q = _posts_json.select().where(Post.location_id == location_id)
+    return cached_json(request, [posts_tag(location_id)], _posts_json,
+                       lambda response: paginate(session, q, Post.created_at, Post.id, page, response, desc=True))
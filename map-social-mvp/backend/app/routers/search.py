@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from sqlmodel import Session
+from ..db import get_session
+from ..schemas import SearchResults
+from ..search import search_locations, search_posts, to_match
+from ..spatial import parse_bbox
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+@router.get("", response_model=SearchResults)
+def search(
+    q: str = Query(min_length=1, max_length=200),
+    type: str = Query(default="all", pattern="^(all|locations|posts)$"),
+    bbox: Optional[str] = Query(default=None, description="minLon,minLat,maxLon,maxLat"),
+    kind: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    session: Session = Depends(get_session),
+):
+    if session.get_bind().dialect.name != "sqlite":
+        raise HTTPException(status_code=501, detail="Search needs the SQLite FTS5 index")
+    match = to_match(q)
+    if not match:
+        return SearchResults()
+    box = parse_bbox(bbox)
+    return SearchResults(
+        locations=search_locations(session, match, limit, box, kind) if type in ("all", "locations") else [],
+        posts=search_posts(session, match, limit, box, kind) if type in ("all", "posts") else [],
+    )
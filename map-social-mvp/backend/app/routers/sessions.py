@@ -1,23 +1,76 @@
-from fastapi import APIRouter, Depends
-from typing import List
+import math
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, Query, Request
+from typing import List, Optional
 from sqlmodel import Session, select
-from ..db import get_session, init_db
-from ..models import SessionEvent, User
-from ..schemas import SessionCreate, SessionPublic
+from ..db import get_session
+from .. import realtime
+from ..models import Location, SessionEvent, User
+from ..schemas import LocationPublic, SessionCreate, SessionNearby, SessionPublic
 from ..deps import get_current_user
+from ..pagination import Page, paginate
+from ..response_cache import cached_json, invalidate, sessions_tag, detail_tag
+from ..fastjson import RowsJSON
+from ..spatial import bbox_around, haversine_km, within_bbox
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
 @router.post("", response_model=SessionPublic)
 def create_session(payload: SessionCreate, current: User = Depends(get_current_user), session: Session = Depends(get_session)):
-    init_db()
     s = SessionEvent(**payload.dict(), host_id=current.id)
     session.add(s)
     session.commit()
     session.refresh(s)
+    invalidate(sessions_tag(s.location_id), detail_tag(s.location_id))
+    realtime.publish("session.created", session.get(Location, s.location_id), SessionPublic.model_validate(s))
     return s
 
+_sessions_json = RowsJSON(SessionEvent, SessionPublic)
+
 @router.get("", response_model=List[SessionPublic])
-def list_sessions(location_id: int, session: Session = Depends(get_session)):
-    items = session.exec(select(SessionEvent).where(SessionEvent.location_id == location_id).order_by(SessionEvent.starts_at.asc())).all()
-    return items
+def list_sessions(location_id: int, request: Request, page: Page = Depends(), session: Session = Depends(get_session)):
+    q = _sessions_json.select().where(SessionEvent.location_id == location_id)
+    return cached_json(request, [sessions_tag(location_id)], _sessions_json,
+                       lambda response: paginate(session, q, SessionEvent.starts_at, SessionEvent.id, page, response))
+
+# Upper bound on rows pulled from the index prefilter before exact ranking
+NEARBY_MAX_CANDIDATES = 5000
+
+@router.get("/nearby", response_model=List[SessionNearby])
+def nearby_sessions(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    radius_km: float = Query(default=10, gt=0, le=500),
+    hours: float = Query(default=24, gt=0, le=24 * 30),
+    activity: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    session: Session = Depends(get_session),
+):
+    """Sessions starting within `hours` at locations within `radius_km`, nearest first."""
+    now = datetime.utcnow()
+    q = (
+        select(SessionEvent, Location)
+        .join(Location, Location.id == SessionEvent.location_id)
+        .where(SessionEvent.starts_at >= now, SessionEvent.starts_at <= now + timedelta(hours=hours))
+    )
+    if activity:
+        q = q.where(SessionEvent.activity == activity)
+    # Index prefilter: R*Tree box around the circle plus the starts_at range.
+    q = within_bbox(q, bbox_around(lat, lon, radius_km), session.get_bind().dialect.name)
+    # Cap the candidates nearest-first (flat-earth squared distance), so a
+    # dense box cannot crowd out in-radius sessions with farther, earlier ones.
+    kx = math.cos(math.radians(lat))
+    proxy = (Location.lat - lat) * (Location.lat - lat) + (Location.lon - lon) * (Location.lon - lon) * (kx * kx)
+    candidates = session.exec(q.order_by(proxy, SessionEvent.starts_at).limit(NEARBY_MAX_CANDIDATES)).all()
+
+    # Exact distance only on the candidate set.
+    ranked = []
+    for ev, loc in candidates:
+        d = haversine_km(lat, lon, loc.lat, loc.lon)
+        if d <= radius_km:
+            ranked.append((d, ev.starts_at, ev, loc))
+    ranked.sort(key=lambda r: (r[0], r[1]))
+    return [
+        SessionNearby(**SessionPublic.model_validate(ev).model_dump(), distance_km=round(d, 3), location=LocationPublic.model_validate(loc))
+        for d, _, ev, loc in ranked[:limit]
+    ]
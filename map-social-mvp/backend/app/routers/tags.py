@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, Query, Response
+from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+from ..db import get_session
+from ..models import Location, Post, PostTag
+from ..schemas import PostPublic, TagCount
+from ..pagination import NEXT_CURSOR_HEADER, Page, paginate
+from ..fastjson import RowsJSON
+from ..spatial import parse_bbox, within_bbox
+from ..tags import normalize_tags
+
+router = APIRouter(prefix="/tags", tags=["tags"])
+
+def _scope(q, post_col, location_id: Optional[int], bbox: Optional[str], session: Session):
+    """Limit a PostTag query to one location or to posts at locations in a bbox."""
+    box = parse_bbox(bbox)
+    if location_id is None and not box:
+        return q
+    q = q.join(Post, Post.id == post_col)
+    if location_id is not None:
+        q = q.where(Post.location_id == location_id)
+    if box:
+        q = within_bbox(q.join(Location, Location.id == Post.location_id), box, session.get_bind().dialect.name)
+    return q
+
+@router.get("", response_model=List[TagCount])
+def tag_counts(
+    session: Session = Depends(get_session),
+    location_id: Optional[int] = None,
+    bbox: Optional[str] = Query(default=None, description="minLon,minLat,maxLon,maxLat"),
+    limit: int = Query(default=50, ge=1, le=500),
+):
+    """Tag facets: how many posts carry each tag, most used first."""
+    n = func.count().label("n")
+    q = _scope(select(PostTag.tag, n), PostTag.post_id, location_id, bbox, session)
+    rows = session.exec(q.group_by(PostTag.tag).order_by(n.desc(), PostTag.tag).limit(limit)).all()
+    return [TagCount(tag=t, count=c) for t, c in rows]
+
+_posts_json = RowsJSON(Post, PostPublic)
+
+@router.get("/posts", response_model=List[PostPublic])
+def posts_by_tag(
+    tag: List[str] = Query(description="Repeat for posts carrying all of the tags"),
+    location_id: Optional[int] = None,
+    bbox: Optional[str] = Query(default=None, description="minLon,minLat,maxLon,maxLat"),
+    page: Page = Depends(),
+    session: Session = Depends(get_session),
+):
+    """Newest posts with the given tag(s), walking the (tag, created_at) index."""
+    wanted = normalize_tags(",".join(tag))
+    if not wanted:
+        return []
+    # The first tag drives the index scan; the others are primary-key probes.
+    lead = aliased(PostTag)
+    q = _posts_json.select().join(lead, lead.post_id == Post.id).where(lead.tag == wanted[0])
+    for t in wanted[1:]:
+        other = aliased(PostTag)
+        q = q.join(other, (other.post_id == lead.post_id) & (other.tag == t))
+    if location_id is not None:
+        q = q.where(Post.location_id == location_id)
+    box = parse_bbox(bbox)
+    if box:
+        q = within_bbox(q.join(Location, Location.id == Post.location_id), box, session.get_bind().dialect.name)
+    scratch = Response()
+    rows = paginate(session, q, lead.created_at, lead.post_id, page, scratch, desc=True)
+    cursor = scratch.headers.get(NEXT_CURSOR_HEADER)
+    return _posts_json.response(rows, {NEXT_CURSOR_HEADER: cursor} if cursor else None)
@@ -1,36 +1,65 @@
 import os
-from datetime import datetime
+import re
+import hashlib
+from uuid import uuid4
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
-from fastapi.responses import JSONResponse
-from PIL import Image
+from fastapi.concurrency import run_in_threadpool
 import aiofiles
 
+from .. import images, storage
 from ..deps import get_current_user
 
-UPLOAD_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "static", "uploads"))
+# Raw uploads and freshly built renditions, before they move into the store
+INCOMING_DIR = os.getenv("UPLOAD_STAGING_DIR", os.path.join(storage.MEDIA_DIR, ".incoming"))
+CHUNK_SIZE = 1024 * 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024
 
 router = APIRouter(prefix="/upload", tags=["upload"])
 
+def _describe(digest: str, state: str) -> dict:
+    renditions = {n: storage.media_url(images.rendition_name(digest, n)) for n in images.RENDITIONS}
+    return {
+        "id": digest,
+        "status": state,
+        "url": renditions["full"],
+        "renditions": renditions,
+        "status_url": f"/upload/image/{digest}",
+    }
+
 @router.post("/image")
 async def upload_image(file: UploadFile = File(...), user=Depends(get_current_user)):
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Only images allowed")
-    ts = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
-    ext = os.path.splitext(file.filename)[1].lower() or ".jpg"
-    fname = f"{ts}{ext}"
-    fpath = os.path.join(UPLOAD_DIR, fname)
-
-    # Save to disk
-    async with aiofiles.open(fpath, "wb") as out:
-        content = await file.read()
-        await out.write(content)
-
-    # Try to open and make a modest thumbnail to ensure valid image
-    try:
-        im = Image.open(fpath)
-        im.thumbnail((1600, 1600))
-        im.save(fpath)
-    except Exception:
+    os.makedirs(INCOMING_DIR, exist_ok=True)
+    tmp = os.path.join(INCOMING_DIR, uuid4().hex)
+
+    # Stream to disk in chunks, hashing as we go
+    h = hashlib.sha256()
+    size = 0
+    async with aiofiles.open(tmp, "wb") as out:
+        while chunk := await file.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_UPLOAD_BYTES:
+                await out.close()
+                os.remove(tmp)
+                raise HTTPException(status_code=413, detail="Image too large")
+            h.update(chunk)
+            await out.write(chunk)
+
+    if not await run_in_threadpool(images.probe, tmp):
+        os.remove(tmp)
         raise HTTPException(status_code=400, detail="Invalid image")
 
-    return {"url": f"/static/uploads/{fname}"}
+    # Decoding and resizing happen in the process pool; the URLs are final now.
+    digest = h.hexdigest()[:32]
+    await run_in_threadpool(images.submit, tmp, INCOMING_DIR, digest)
+    return _describe(digest, await run_in_threadpool(images.status, digest) or "pending")
+
+@router.get("/image/{image_id}")
+def image_status(image_id: str):
+    if not re.fullmatch(r"[0-9a-f]{32}", image_id):
+        raise HTTPException(status_code=404, detail="Unknown image")
+    state = images.status(image_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Unknown image")
+    return _describe(image_id, state)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 from pydantic import BaseModel, EmailStr
 
 # Auth
@@ -101,3 +101,43 @@ class SessionPublic(BaseModel):
 
     class Config:
         from_attributes = True
+
+# Cluster
+class ClusterPublic(BaseModel):
+    lat: float
+    lon: float
+    count: int
+    kinds: Dict[str, int]
+    location_id: Optional[int] = None  # set when the cluster is a single location
+
+# Location detail (one round trip for the location drawer)
+class AuthorPublic(BaseModel):
+    id: int
+    display_name: str
+
+    class Config:
+        from_attributes = True
+
+class PostDetail(PostPublic):
+    author: Optional[AuthorPublic] = None
+    comment_count: int = 0
+    first_comments: List[CommentPublic] = []
+
+class LocationDetail(BaseModel):
+    location: LocationPublic
+    posts: List[PostDetail]
+    upcoming_sessions: List[SessionPublic]
+
+# Search
+class SearchResults(BaseModel):
+    locations: List[LocationPublic] = []
+    posts: List[PostPublic] = []
+
+# Tags
+class TagCount(BaseModel):
+    tag: str
+    count: int
+
+class SessionNearby(SessionPublic):
+    distance_km: float
+    location: LocationPublic
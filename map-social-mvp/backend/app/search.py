@@ -0,0 +1,82 @@
+import re
+from typing import List, Optional
+from sqlalchemy import column, func, table, text
+from sqlmodel import Session, select
+
+from .models import Location, Post
+from .spatial import BBox, within_bbox
+
+# SQLite FTS5 external-content indexes over Post and Location, kept in sync by
+# triggers (same approach as the R*Tree in spatial.py).
+post_fts = table("post_fts", column("rowid"))
+location_fts = table("location_fts", column("rowid"))
+
+def _sync_triggers(fts: str, src: str, cols: List[str]) -> List[str]:
+    names = ", ".join(cols)
+    new = ", ".join(f"new.{c}" for c in cols)
+    old = ", ".join(f"old.{c}" for c in cols)
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {src} BEGIN
+            INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {src} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {names} ON {src} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old});
+            INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});
+        END""",
+    ]
+
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5(content, tags, content='post', content_rowid='id')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS location_fts USING fts5(title, description, address, content='location', content_rowid='id')",
+    *_sync_triggers("post_fts", "post", ["content", "tags"]),
+    *_sync_triggers("location_fts", "location", ["title", "description", "address"]),
+]
+
+def install(conn):
+    """Create the FTS5 tables and triggers, then index existing rows."""
+    for ddl in FTS_DDL:
+        conn.execute(text(ddl))
+    conn.execute(text("INSERT INTO post_fts(post_fts) VALUES ('rebuild')"))
+    conn.execute(text("INSERT INTO location_fts(location_fts) VALUES ('rebuild')"))
+
+def to_match(q: str) -> Optional[str]:
+    """User text -> FTS5 query: every word must match, last one as a prefix."""
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+def search_locations(session: Session, match: str, limit: int, box: Optional[BBox] = None, kind: Optional[str] = None):
+    # bm25 column weights: title, description, address
+    score = func.bm25(text("location_fts"), 10.0, 2.0, 1.0)
+    q = (
+        select(Location)
+        .join(location_fts, location_fts.c.rowid == Location.id)
+        .where(text("location_fts MATCH :match"))
+    )
+    if kind:
+        q = q.where(Location.kind == kind)
+    if box:
+        q = within_bbox(q, box)
+    return session.exec(q.order_by(score).limit(limit).params(match=match)).all()
+
+def search_posts(session: Session, match: str, limit: int, box: Optional[BBox] = None, kind: Optional[str] = None):
+    # bm25 column weights: content, tags
+    score = func.bm25(text("post_fts"), 1.0, 3.0)
+    q = (
+        select(Post)
+        .join(post_fts, post_fts.c.rowid == Post.id)
+        .where(text("post_fts MATCH :match"))
+    )
+    if box or kind:
+        q = q.join(Location, Location.id == Post.location_id)
+        if kind:
+            q = q.where(Location.kind == kind)
+        if box:
+            q = within_bbox(q, box)
+    return session.exec(q.order_by(score).limit(limit).params(match=match)).all()
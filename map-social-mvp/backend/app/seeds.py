@@ -1,4 +1,4 @@
-from sqlmodel import Session
+from sqlmodel import Session, select
 from .db import engine, init_db
 from .models import User, Location, Post, Comment, SessionEvent
 from .deps import hash_password
@@ -28,7 +28,7 @@ def run():
         s.commit()
 
         # Posts
-        L1 = s.exec(s.query(Location).filter(Location.title == "Earth Treks Rockville")).first()
+        L1 = s.exec(select(Location).where(Location.title == "Earth Treks Rockville")).first()
         if L1:
             p1 = Post(location_id=L1.id, author_id=alice.id, content="Looking for bouldering partners Sat morning, V2–V4.", tags="bouldering,partner")
             p2 = Post(location_id=L1.id, author_id=bob.id, content="New to lead climbing. Anyone up for 5.9 routes tonight?", tags="lead,partner")
@@ -0,0 +1,75 @@
+import math
+from typing import Optional, Tuple
+from sqlalchemy import column, table, text
+
+from .models import Location
+
+BBox = Tuple[float, float, float, float]  # minLon, minLat, maxLon, maxLat
+
+EARTH_RADIUS_KM = 6371.0088
+
+# SQLite R*Tree mirror of Location(lon, lat); kept in sync by triggers so the
+# ORM never has to know about it.
+location_rtree = table(
+    "location_rtree",
+    column("id"), column("min_lon"), column("max_lon"), column("min_lat"), column("max_lat"),
+)
+
+RTREE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS location_rtree USING rtree(id, min_lon, max_lon, min_lat, max_lat)",
+    """CREATE TRIGGER IF NOT EXISTS location_rtree_ai AFTER INSERT ON location BEGIN
+        INSERT INTO location_rtree VALUES (new.id, new.lon, new.lon, new.lat, new.lat);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS location_rtree_au AFTER UPDATE OF lat, lon ON location BEGIN
+        UPDATE location_rtree SET min_lon = new.lon, max_lon = new.lon, min_lat = new.lat, max_lat = new.lat
+        WHERE id = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS location_rtree_ad AFTER DELETE ON location BEGIN
+        DELETE FROM location_rtree WHERE id = old.id;
+    END""",
+]
+
+def install(conn):
+    """Create the R*Tree index and triggers, backfilling it the first time."""
+    exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'location_rtree'")).first()
+    for ddl in RTREE_DDL:
+        conn.execute(text(ddl))
+    if not exists:
+        conn.execute(text("INSERT INTO location_rtree SELECT id, lon, lon, lat, lat FROM location"))
+
+def parse_bbox(bbox: Optional[str]) -> Optional[BBox]:
+    if not bbox:
+        return None
+    try:
+        minLon, minLat, maxLon, maxLat = [float(x) for x in bbox.split(",")]
+    except ValueError:
+        return None
+    if not all(math.isfinite(v) for v in (minLon, minLat, maxLon, maxLat)):
+        return None  # "nan"/"inf" parse as floats but are not coordinates
+    return minLon, minLat, maxLon, maxLat
+
+def within_bbox(q, box: BBox, dialect: str = "sqlite"):
+    """Restrict a select() over Location to a bbox, using the R*Tree on SQLite."""
+    minLon, minLat, maxLon, maxLat = box
+    if dialect == "sqlite":
+        rt = location_rtree.c
+        q = q.join(location_rtree, rt.id == Location.id).where(
+            rt.max_lon >= minLon, rt.min_lon <= maxLon,
+            rt.max_lat >= minLat, rt.min_lat <= maxLat,
+        )
+    # R*Tree stores float32 bounds rounded outward; the exact test trims the edges
+    # (and is the whole filter on other backends, served by the lat/lon indexes).
+    return q.where(Location.lon.between(minLon, maxLon), Location.lat.between(minLat, maxLat))
+
+def bbox_around(lat: float, lon: float, radius_km: float) -> BBox:
+    """Smallest lon/lat box containing the circle; used as an index prefilter."""
+    r = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(r)
+    coslat = math.cos(math.radians(lat))
+    dlon = 180.0 if math.sin(r) >= coslat else math.degrees(math.asin(math.sin(r) / coslat))
+    return lon - dlon, max(-90.0, lat - dlat), lon + dlon, min(90.0, lat + dlat)
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
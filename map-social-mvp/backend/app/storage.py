@@ -0,0 +1,169 @@
+"""Content-addressed media storage.
+
+Blobs are named `<digest>_<rendition>.webp`, where digest is the sha256 prefix
+of the uploaded bytes, so identical photos are stored once. Blob rows count
+how many Post.photo_url values point at a digest; `python -m app.storage gc`
+removes unreferenced blobs once they are older than a grace period.
+"""
+import os
+import re
+import shutil
+import time
+from typing import Iterator, Optional, Tuple
+
+from sqlalchemy import event, inspect, select, text
+
+from .models import Blob, Post
+
+MEDIA_URL = "/media"
+MEDIA_DIR = os.getenv("MEDIA_DIR", os.path.abspath(os.path.join(os.path.dirname(__file__), "static", "uploads")))
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local")  # local | s3
+GC_GRACE_SECONDS = int(os.getenv("MEDIA_GC_GRACE_SECONDS", str(24 * 3600)))
+
+_DIGEST_RE = re.compile(r"/media/([0-9a-f]{32})_")
+BLOB_NAME_RE = re.compile(r"[0-9a-f]{32}_[a-z]+\.webp")
+READ_CHUNK = 256 * 1024
+
+class LocalStore:
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def put(self, name: str, src: str):
+        shutil.move(src, self._path(name))
+
+    def size(self, name: str) -> Optional[int]:
+        try:
+            return os.path.getsize(self._path(name))
+        except OSError:
+            return None
+
+    def read(self, name: str, start: int, end: int) -> Iterator[bytes]:
+        """Yield bytes [start, end] (inclusive)."""
+        with open(self._path(name), "rb") as f:
+            f.seek(start)
+            left = end - start + 1
+            while left > 0:
+                chunk = f.read(min(READ_CHUNK, left))
+                if not chunk:
+                    break
+                left -= len(chunk)
+                yield chunk
+
+    def delete(self, name: str):
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+    def list(self) -> Iterator[Tuple[str, float]]:
+        for entry in os.scandir(self.root):
+            if entry.is_file() and not entry.name.startswith("."):
+                yield entry.name, entry.stat().st_mtime
+
+class S3Store:
+    """Any S3-compatible endpoint (AWS, MinIO, ...); needs boto3."""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+        self.s3 = boto3.client("s3", endpoint_url=endpoint_url)
+        self._missing = ClientError
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def put(self, name: str, src: str):
+        self.s3.upload_file(src, self.bucket, self.prefix + name, ExtraArgs={"ContentType": "image/webp"})
+        os.remove(src)
+
+    def size(self, name: str) -> Optional[int]:
+        try:
+            return self.s3.head_object(Bucket=self.bucket, Key=self.prefix + name)["ContentLength"]
+        except self._missing:
+            return None
+
+    def read(self, name: str, start: int, end: int) -> Iterator[bytes]:
+        obj = self.s3.get_object(Bucket=self.bucket, Key=self.prefix + name, Range=f"bytes={start}-{end}")
+        yield from obj["Body"].iter_chunks(READ_CHUNK)
+
+    def delete(self, name: str):
+        self.s3.delete_object(Bucket=self.bucket, Key=self.prefix + name)
+
+    def list(self) -> Iterator[Tuple[str, float]]:
+        pages = self.s3.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=self.prefix)
+        for page in pages:
+            for obj in page.get("Contents", []):
+                yield obj["Key"][len(self.prefix):], obj["LastModified"].timestamp()
+
+_store = None
+
+def get_store():
+    global _store
+    if _store is None:
+        if STORAGE_BACKEND == "s3":
+            _store = S3Store(os.environ["S3_BUCKET"], os.getenv("S3_PREFIX", "media/"), os.getenv("S3_ENDPOINT_URL"))
+        else:
+            _store = LocalStore(MEDIA_DIR)
+    return _store
+
+def media_url(name: str) -> str:
+    return f"{MEDIA_URL}/{name}"
+
+def digest_of(url: Optional[str]) -> Optional[str]:
+    m = _DIGEST_RE.search(url or "")
+    return m.group(1) if m else None
+
+# ── Reference counting, kept in step with Post.photo_url by mapper events ──
+
+def _incref(conn, digest: Optional[str]):
+    if digest:
+        conn.execute(text(
+            "INSERT INTO blob (digest, refcount, created_at) VALUES (:d, 1, CURRENT_TIMESTAMP) "
+            "ON CONFLICT (digest) DO UPDATE SET refcount = blob.refcount + 1"
+        ), {"d": digest})
+
+def _decref(conn, digest: Optional[str]):
+    if digest:
+        conn.execute(text("UPDATE blob SET refcount = refcount - 1 WHERE digest = :d AND refcount > 0"), {"d": digest})
+
+@event.listens_for(Post, "after_insert")
+def _post_inserted(_mapper, conn, target: Post):
+    _incref(conn, digest_of(target.photo_url))
+
+@event.listens_for(Post, "after_update")
+def _post_updated(_mapper, conn, target: Post):
+    hist = inspect(target).attrs.photo_url.history
+    if hist.has_changes():
+        for old in hist.deleted or ():
+            _decref(conn, digest_of(old))
+        _incref(conn, digest_of(target.photo_url))
+
+@event.listens_for(Post, "after_delete")
+def _post_deleted(_mapper, conn, target: Post):
+    _decref(conn, digest_of(target.photo_url))
+
+def collect_garbage(engine, grace_seconds: int = GC_GRACE_SECONDS) -> int:
+    """Delete blobs no post references, skipping fresh uploads not yet attached."""
+    with engine.connect() as conn:
+        live = set(conn.execute(select(Blob.digest).where(Blob.refcount > 0)).scalars())
+    store = get_store()
+    cutoff = time.time() - grace_seconds
+    removed = 0
+    for name, mtime in list(store.list()):
+        if BLOB_NAME_RE.fullmatch(name) and name[:32] not in live and mtime < cutoff:
+            store.delete(name)
+            removed += 1
+    return removed
+
+if __name__ == "__main__":
+    import sys
+    from .db import engine
+    if sys.argv[1:] != ["gc"]:
+        sys.exit("usage: python -m app.storage gc")
+    print(f"Removed {collect_garbage(engine)} unreferenced blob(s)")
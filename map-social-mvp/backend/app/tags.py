@@ -0,0 +1,43 @@
+"""Post tags, normalized into PostTag rows.
+
+Post.tags stays the comma-separated source of truth that clients send and
+read; mapper events mirror it into PostTag so tag filters are index lookups
+on (tag, created_at) instead of string splitting over every post.
+"""
+from typing import List, Optional
+
+from sqlalchemy import delete, event, inspect
+
+from .models import Post, PostTag
+
+MAX_TAG_LENGTH = 40
+
+def normalize_tags(raw: Optional[str]) -> List[str]:
+    seen = []
+    for t in (raw or "").split(","):
+        t = t.strip().lower()[:MAX_TAG_LENGTH]
+        if t and t not in seen:
+            seen.append(t)
+    return seen
+
+def tag_rows(post_id: int, raw: Optional[str], created_at) -> List[dict]:
+    return [{"post_id": post_id, "tag": t, "created_at": created_at} for t in normalize_tags(raw)]
+
+def _insert(conn, target: Post):
+    rows = tag_rows(target.id, target.tags, target.created_at)
+    if rows:
+        conn.execute(PostTag.__table__.insert(), rows)
+
+@event.listens_for(Post, "after_insert")
+def _post_inserted(_mapper, conn, target: Post):
+    _insert(conn, target)
+
+@event.listens_for(Post, "after_update")
+def _post_updated(_mapper, conn, target: Post):
+    if inspect(target).attrs.tags.history.has_changes():
+        conn.execute(delete(PostTag).where(PostTag.post_id == target.id))
+        _insert(conn, target)
+
+@event.listens_for(Post, "after_delete")
+def _post_deleted(_mapper, conn, target: Post):
+    conn.execute(delete(PostTag).where(PostTag.post_id == target.id))
@@ -0,0 +1,40 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import tempfile
+
+import httpx
+
+def pct(samples, p):
+    if not samples:
+        return float("nan")
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(len(s) * p / 100))]
+
+def stats(samples, elapsed, errors=0):
+    return {
+        "n": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(samples) / len(samples), 3) if samples else None,
+        "p50_ms": round(pct(samples, 50), 3) if samples else None,
+        "p95_ms": round(pct(samples, 95), 3) if samples else None,
+        "p99_ms": round(pct(samples, 99), 3) if samples else None,
+    }
+
+def summary(name, samples, elapsed):
+    return (f"{name:<12} n={len(samples):<6} rps={len(samples) / elapsed:8.1f}  "
+            f"p50={pct(samples, 50):7.1f}ms  p95={pct(samples, 95):7.1f}ms  p99={pct(samples, 99):7.1f}ms")
+
+def use_temp_db():
+    """Point the app at a throwaway SQLite file unless SQLITE_PATH is set. Call before importing app."""
+    os.environ.setdefault("SQLITE_PATH", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+def make_client(url=None):
+    """Client for a running server at `url`, or for the app in this process."""
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=60)
+    use_temp_db()
+    from app.db import init_db
+    from app.main import app
+    init_db()
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
@@ -0,0 +1,63 @@
+"""
+Login load scenario: concurrent /auth/token calls alongside authenticated reads.
+
+Shows login latency under a burst of logins and checks that authenticated
+reads (/auth/me) keep flowing while bcrypt is busy.
+
+    python -m bench.login_load                       # in-process app, temp SQLite
+    python -m bench.login_load --url http://localhost:8000 --users 50
+"""
+import argparse
+import asyncio
+import time
+
+from bench.common import make_client, summary
+
+PASSWORD = "loadtest-pw"
+
+async def run(url, users, logins, readers, duration):
+    async with make_client(url) as client:
+        emails = [f"load{i}@example.com" for i in range(users)]
+        for email in emails:
+            await client.post("/auth/register", json={"email": email, "display_name": email, "password": PASSWORD})
+        r = await client.post("/auth/token", data={"username": emails[0], "password": PASSWORD})
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+        login_ms, read_ms = [], []
+        deadline = time.perf_counter() + duration
+
+        async def login_worker(i):
+            while time.perf_counter() < deadline:
+                t = time.perf_counter()
+                r = await client.post("/auth/token", data={"username": emails[i % users], "password": PASSWORD})
+                r.raise_for_status()
+                login_ms.append((time.perf_counter() - t) * 1000)
+                i += logins
+
+        async def read_worker():
+            while time.perf_counter() < deadline:
+                t = time.perf_counter()
+                r = await client.get("/auth/me", headers=headers)
+                r.raise_for_status()
+                read_ms.append((time.perf_counter() - t) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[login_worker(i) for i in range(logins)], *[read_worker() for _ in range(readers)])
+        elapsed = time.perf_counter() - start
+
+    print(f"{logins} concurrent logins + {readers} readers for {duration:.0f}s")
+    print(summary("/auth/token", login_ms, elapsed))
+    print(summary("/auth/me", read_ms, elapsed))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process app)")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=32, help="Concurrent login loops")
+    parser.add_argument("--readers", type=int, default=8, help="Concurrent /auth/me loops")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    args = parser.parse_args()
+    asyncio.run(run(args.url, args.users, args.logins, args.readers, args.duration))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Mixed read/write workload against the API with per-route latency percentiles.
+
+Seeds a synthetic dataset (bench/seed.py), drives a weighted mix of the real
+endpoints from concurrent workers for a fixed duration, writes the results to
+bench/results/<timestamp>.json and prints p50/p99 deltas against the
+previous results file.
+
+    python -m bench.run                                   # in-process app, fresh temp SQLite
+    python -m bench.run --locations 20000 --posts 100000 --duration 60 --workers 32
+    python -m bench.run --url http://localhost:8000       # server DB seeded beforehand with bench.seed, same sizes
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime
+
+from bench.common import make_client, stats, use_temp_db
+from bench.seed import PASSWORD, REGION, TAGS, WORDS, email_of, seed
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# (route name, weight); the name is the stats key, so keep it stable across runs
+MIX = [
+    ("GET /locations?bbox", 30),
+    ("GET /clusters", 10),
+    ("GET /locations/{id}/detail", 15),
+    ("GET /posts", 15),
+    ("GET /comments", 10),
+    ("GET /sessions/nearby", 5),
+    ("GET /search", 5),
+    ("POST /posts", 5),
+    ("POST /comments", 5),
+]
+
+def _random_bbox(rng, span):
+    minLon, minLat, maxLon, maxLat = REGION
+    lon = rng.uniform(minLon, maxLon - span)
+    lat = rng.uniform(minLat, maxLat - span)
+    return f"{lon:.5f},{lat:.5f},{lon + span:.5f},{lat + span:.5f}"
+
+def _request(rng, route, args, headers):
+    """(method, path, kwargs) for one request of the given route."""
+    loc = rng.randint(1, args.locations)
+    if route == "GET /locations?bbox":
+        return "GET", "/locations", {"params": {"bbox": _random_bbox(rng, rng.choice([0.05, 0.2, 0.5]))}}
+    if route == "GET /clusters":
+        return "GET", "/clusters", {"params": {"bbox": _random_bbox(rng, 1.0), "zoom": rng.randint(8, 12)}}
+    if route == "GET /locations/{id}/detail":
+        return "GET", f"/locations/{loc}/detail", {}
+    if route == "GET /posts":
+        return "GET", "/posts", {"params": {"location_id": loc}}
+    if route == "GET /comments":
+        return "GET", "/comments", {"params": {"post_id": rng.randint(1, args.posts)}}
+    if route == "GET /sessions/nearby":
+        minLon, minLat, maxLon, maxLat = REGION
+        return "GET", "/sessions/nearby", {"params": {
+            "lat": rng.uniform(minLat, maxLat), "lon": rng.uniform(minLon, maxLon), "radius_km": 15, "hours": 72}}
+    if route == "GET /search":
+        return "GET", "/search", {"params": {"q": rng.choice(WORDS)}}
+    if route == "POST /posts":
+        return "POST", "/posts", {"headers": headers, "json": {
+            "location_id": loc, "content": " ".join(rng.choices(WORDS, k=10)), "tags": rng.choice(TAGS)}}
+    if route == "POST /comments":
+        return "POST", "/comments", {"headers": headers, "json": {
+            "post_id": rng.randint(1, args.posts), "content": " ".join(rng.choices(WORDS, k=6))}}
+    raise ValueError(route)
+
+async def drive(client, args):
+    r = await client.post("/auth/token", data={"username": email_of(1), "password": PASSWORD})
+    r.raise_for_status()
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    routes, weights = zip(*MIX)
+    samples = {name: [] for name in routes}
+    errors = {name: 0 for name in routes}
+
+    for _ in range(args.warmup):
+        rng = random.Random()
+        method, path, kw = _request(rng, rng.choices(routes, weights)[0], args, headers)
+        await client.request(method, path, **kw)
+
+    deadline = time.perf_counter() + args.duration
+
+    async def worker(i):
+        rng = random.Random(args.seed * 1000 + i)
+        while time.perf_counter() < deadline:
+            route = rng.choices(routes, weights)[0]
+            method, path, kw = _request(rng, route, args, headers)
+            t = time.perf_counter()
+            r = await client.request(method, path, **kw)
+            ms = (time.perf_counter() - t) * 1000
+            if r.status_code >= 400:
+                errors[route] += 1
+            else:
+                samples[route].append(ms)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(i) for i in range(args.workers)])
+    elapsed = time.perf_counter() - start
+
+    everything = [ms for s in samples.values() for ms in s]
+    routes_out = {name: stats(samples[name], elapsed, errors[name]) for name in routes}
+    routes_out["all"] = stats(everything, elapsed, sum(errors.values()))
+    return routes_out
+
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+def _previous_results():
+    files = sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json")))
+    if not files:
+        return None, None
+    with open(files[-1]) as f:
+        return files[-1], json.load(f)
+
+def _fmt_delta(now, before):
+    if now is None or before is None or not before:
+        return ""
+    return f" ({(now - before) / before * 100:+.0f}%)"
+
+def report(routes_out, previous):
+    prev_routes = (previous or {}).get("routes", {})
+    print(f"{'route':<28} {'n':>7} {'err':>5} {'rps':>8}  {'p50 ms':>16} {'p99 ms':>16}")
+    for name, s in routes_out.items():
+        p = prev_routes.get(name, {})
+        p50 = f"{s['p50_ms'] or 0:.1f}{_fmt_delta(s['p50_ms'], p.get('p50_ms'))}"
+        p99 = f"{s['p99_ms'] or 0:.1f}{_fmt_delta(s['p99_ms'], p.get('p99_ms'))}"
+        print(f"{name:<28} {s['n']:>7} {s['errors']:>5} {s['rps']:>8.1f}  {p50:>16} {p99:>16}")
+
+async def run(args):
+    if not args.url:
+        use_temp_db()
+        from app.db import engine, init_db
+        init_db()
+        t = time.perf_counter()
+        seed(engine, args.users, args.locations, args.posts, args.comments, args.sessions, args.seed)
+        print(f"seeded in {time.perf_counter() - t:.1f}s")
+
+    async with make_client(args.url) as client:
+        routes_out = await drive(client, args)
+
+    prev_path, previous = _previous_results()
+    result = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git_rev": _git_rev(),
+            "target": args.url or "in-process",
+            "python": platform.python_version(),
+            "params": {k: getattr(args, k) for k in
+                       ("users", "locations", "posts", "comments", "sessions", "workers", "duration", "warmup", "seed")},
+        },
+        "routes": routes_out,
+    }
+    report(routes_out, previous)
+    if prev_path:
+        print(f"deltas vs {os.path.basename(prev_path)}")
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, datetime.utcnow().strftime("%Y%m%dT%H%M%SZ") + ".json")
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"wrote {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process app)")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--locations", type=int, default=5000)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--comments", type=int, default=40000)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=16, help="Concurrent request loops")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument("--warmup", type=int, default=200, help="Requests before timing starts")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-save", action="store_true", help="Print only; do not write bench/results/")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
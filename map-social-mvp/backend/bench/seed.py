@@ -0,0 +1,101 @@
+"""
+Bulk synthetic data for benchmarks (the scaled-up cousin of app/seeds.py).
+
+Rows go in with executemany inside one transaction per table, and every user
+shares one bcrypt hash, so 100k+ rows take seconds rather than minutes.
+
+    python -m bench.seed --users 200 --locations 20000 --posts 100000 --comments 200000
+    SQLITE_PATH=./app/data.db python -m bench.seed ...   # seed the server's DB for --url runs
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+PASSWORD = "bench-pw"
+KINDS = ["restaurant", "climbing_gym", "ski_resort", "city", "running_route", "hiking_route"]
+TAGS = ["bouldering", "partner", "lead", "trail", "ski", "food", "run", "meetup", "beginner", "coffee"]
+WORDS = ("looking for partners saturday morning climbing session anyone up for a run after work "
+         "new route set great coffee trail conditions muddy powder day carpool from downtown").split()
+# Default region: the DMV sample area from app/seeds.py
+REGION = (-78.0, 38.5, -76.5, 39.8)  # minLon, minLat, maxLon, maxLat
+
+def email_of(i: int) -> str:
+    return f"bench{i}@example.com"
+
+def _text(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+def seed(engine, users: int, locations: int, posts: int, comments: int, sessions: int, seed: int = 42) -> dict:
+    from app.deps import hash_password
+    from app.models import User, Location, Post, Comment, SessionEvent
+    from app.tags import tag_rows
+    from app.models import PostTag
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    hashed = hash_password(PASSWORD)
+    minLon, minLat, maxLon, maxLat = REGION
+    counts = {}
+
+    def insert(model, rows):
+        t = time.perf_counter()
+        with engine.begin() as conn:
+            for i in range(0, len(rows), 10_000):
+                conn.execute(model.__table__.insert(), rows[i:i + 10_000])
+        counts[model.__tablename__] = {"rows": len(rows), "seconds": round(time.perf_counter() - t, 3)}
+
+    insert(User, [
+        {"id": i, "email": email_of(i), "display_name": f"Bench {i}", "hashed_password": hashed, "created_at": now}
+        for i in range(1, users + 1)
+    ])
+    insert(Location, [
+        {"id": i, "title": f"{rng.choice(KINDS).replace('_', ' ').title()} {i}", "kind": rng.choice(KINDS),
+         "lat": rng.uniform(minLat, maxLat), "lon": rng.uniform(minLon, maxLon),
+         "address": f"{rng.randint(1, 9999)} Bench St", "description": _text(rng, 8),
+         "created_by_id": rng.randint(1, users), "created_at": now}
+        for i in range(1, locations + 1)
+    ])
+    # Core inserts skip the ORM mapper events, so PostTag rows are written here.
+    post_rows, tag_rows_all = [], []
+    for i in range(1, posts + 1):
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+        tags = ",".join(rng.sample(TAGS, rng.randint(0, 3))) or None
+        post_rows.append({"id": i, "location_id": rng.randint(1, locations), "author_id": rng.randint(1, users),
+                          "content": _text(rng, 12), "tags": tags, "created_at": created})
+        tag_rows_all.extend(tag_rows(i, tags, created))
+    insert(Post, post_rows)
+    insert(PostTag, tag_rows_all)
+    insert(Comment, [
+        {"id": i, "post_id": rng.randint(1, posts), "author_id": rng.randint(1, users),
+         "content": _text(rng, 6), "created_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))}
+        for i in range(1, comments + 1)
+    ])
+    session_rows = []
+    for i in range(1, sessions + 1):
+        start = now + timedelta(minutes=rng.randint(-60 * 24 * 7, 60 * 24 * 14))
+        session_rows.append({"id": i, "location_id": rng.randint(1, locations), "host_id": rng.randint(1, users),
+                             "title": _text(rng, 3), "activity": rng.choice(TAGS), "starts_at": start,
+                             "ends_at": start + timedelta(hours=2), "max_people": rng.randint(2, 12),
+                             "created_at": now})
+    insert(SessionEvent, session_rows)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed synthetic benchmark data")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--locations", type=int, default=5000)
+    parser.add_argument("--posts", type=int, default=20000)
+    parser.add_argument("--comments", type=int, default=40000)
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from app.db import engine, init_db
+    init_db()
+    counts = seed(engine, args.users, args.locations, args.posts, args.comments, args.sessions, args.seed)
+    for table, c in counts.items():
+        print(f"{table:<14} {c['rows']:>9} rows  {c['seconds']:>7.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+CPU per request for a 1,000-row GET /locations: ORM + pydantic vs row tuples + orjson.
+
+Measures process CPU time (not wall time) with the response cache bypassed,
+both for the serialization step alone and for the full in-process request.
+
+    python -m bench.serialize --rows 1000 --iterations 200
+"""
+import argparse
+import time
+from typing import List
+
+from bench.common import use_temp_db
+
+def cpu_ms(fn, iterations):
+    fn()
+    start = time.process_time()
+    for _ in range(iterations):
+        fn()
+    return (time.process_time() - start) * 1000 / iterations
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    use_temp_db()
+    from fastapi.testclient import TestClient
+    from pydantic import TypeAdapter
+    from sqlmodel import Session, select
+    from app.db import engine, init_db
+    from app.main import app
+    from app.models import Location
+    from app.response_cache import invalidate, locations_tag
+    from app.routers.locations import _locations_json
+    from app.schemas import LocationPublic
+    from bench.seed import seed
+
+    init_db()
+    seed(engine, users=10, locations=args.rows, posts=0, comments=0, sessions=0)
+    adapter = TypeAdapter(List[LocationPublic])
+
+    def orm_path():
+        with Session(engine) as s:
+            rows = s.exec(select(Location).limit(args.rows)).all()
+            return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    def rows_path():
+        with Session(engine) as s:
+            return _locations_json.dump_json(s.exec(_locations_json.select().limit(args.rows)).all())
+
+    assert orm_path() == rows_path()
+
+    with TestClient(app) as client:
+        def request():
+            invalidate(locations_tag())
+            r = client.get("/locations", params={"limit": args.rows})
+            r.raise_for_status()
+
+        before, after = cpu_ms(orm_path, args.iterations), cpu_ms(rows_path, args.iterations)
+        print(f"query + serialize, {args.rows} rows  ORM+pydantic {before:7.2f} ms CPU   rows+orjson {after:7.2f} ms CPU   ({before / after:.1f}x)")
+        print(f"full GET /locations (uncached)      {cpu_ms(request, args.iterations):7.2f} ms CPU per request")
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,14 @@ type Location = { id:number; title:string; kind:string; lat:number; lon:number;
 
 export function LocationDrawer({ location, onClose }:{ location: Location, onClose: ()=>void }){
   const [posts, setPosts] = useState<any[]>([])
+  const [sessions, setSessions] = useState<any[] | undefined>(undefined)
   const [content, setContent] = useState('')
   const [tags, setTags] = useState('')
   const [file, setFile] = useState<File | null>(null)
 
   useEffect(()=>{
-    api<any[]>(`/posts?location_id=${location.id}`).then(setPosts).catch(console.error)
+    setSessions(undefined)
+    api<any>(`/locations/${location.id}/detail`).then(d => { setPosts(d.posts); setSessions(d.upcoming_sessions) }).catch(console.error)
   }, [location.id])
 
   async function submitPost(){
@@ -50,7 +52,7 @@ export function LocationDrawer({ location, onClose }:{ location: Location, onClo
         </div>
       </div>
 
-      <SessionPanel locationId={location.id} />
+      {sessions ? <SessionPanel locationId={location.id} initial={sessions} /> : null}
 
       <PostFeed items={posts} />
     </div>
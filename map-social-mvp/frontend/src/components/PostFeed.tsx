@@ -4,6 +4,10 @@ import { getToken } from '../lib/auth'
 
 export function PostFeed({items}:{items:any[]}){
   const [comments, setComments] = useState<Record<number, any[]>>({})
+  useEffect(()=>{
+    const firsts = Object.fromEntries(items.filter(p => p.first_comments?.length).map(p => [p.id, p.first_comments]))
+    setComments(prev => ({ ...firsts, ...prev }))
+  }, [items])
   const [text, setText] = useState<Record<number, string>>({})
 
   async function loadComments(postId: number){
@@ -28,7 +32,7 @@ export function PostFeed({items}:{items:any[]}){
           {p.photo_url ? <img className="post-photo" src={p.photo_url} alt="" /> : null}
 
           <div style={{marginTop:8}}>
-            <button className="btn" onClick={()=>loadComments(p.id)}>Load comments</button>
+            <button className="btn" onClick={()=>loadComments(p.id)}>Load comments{p.comment_count ? ` (${p.comment_count})` : ''}</button>
           </div>
           {(comments[p.id]||[]).map(c => (
             <div key={c.id} style={{marginTop:6}} className="small">💬 {c.content} — {new Date(c.created_at).toLocaleString()}</div>
@@ -2,8 +2,8 @@ import React, { useEffect, useState } from 'react'
 import { api } from '../lib/api'
 import { getToken } from '../lib/auth'
 
-export function SessionPanel({locationId}:{locationId:number}){
-  const [items, setItems] = useState<any[]>([])
+export function SessionPanel({locationId, initial}:{locationId:number, initial?:any[]}){
+  const [items, setItems] = useState<any[]>(initial || [])
   const [title, setTitle] = useState('')
   const [activity, setActivity] = useState('bouldering')
   const [start, setStart] = useState('')
@@ -12,7 +12,7 @@ export function SessionPanel({locationId}:{locationId:number}){
   const [notes, setNotes] = useState('')
 
   async function load(){ setItems(await api<any[]>(`/sessions?location_id=${locationId}`)) }
-  useEffect(()=>{ load() }, [locationId])
+  useEffect(()=>{ if (!initial) load() }, [locationId])
 
   async function add(){
     const token = getToken()